@@ -0,0 +1,81 @@
+"""Micro-benchmark of NoteLogic spawning cost per call, before and after the lookup tables.
+
+Run from the repository root: python bench/bench_note_logic.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from note_logic import NoteLogic
+from note_field import NoteField
+from objects import ShortNote, LongNote
+from config import SPAWN_INTERVAL, NUM_LANES, NOTE_SPEED
+
+CONFIG = {'SPAWN_INTERVAL': SPAWN_INTERVAL, 'NUM_LANES': NUM_LANES, 'NOTE_SPEED': NOTE_SPEED}
+
+class LegacyNoteLogic(NoteLogic):
+    """The per-call implementations NoteLogic used before its lookup tables."""
+
+    def get_spawn_interval(self):
+        return max(self.base_spawn_interval - (self.current_difficulty * 50), 500)
+
+    def select_pattern(self):
+        total = sum(p['weight'] for p in self.patterns)
+        r = self.rng.uniform(0, total)
+        upto = 0
+        for pattern in self.patterns:
+            if upto + pattern['weight'] >= r:
+                return pattern
+            upto += pattern['weight']
+        return self.patterns[0]
+
+    def get_available_lanes(self, current_time, pattern_type, note_field):
+        required = self.required_lanes(pattern_type)
+        active_long_note_lanes = {note.lane for note in note_field if isinstance(note, LongNote) and note.active}
+        available = [lane for lane in range(self.config['NUM_LANES'])
+                     if (current_time - self.last_spawn_time[lane]) >= self.min_spawn_interval
+                     and lane not in active_long_note_lanes]
+        if len(available) >= required:
+            if pattern_type == 'burst':
+                return self.rng.sample(available, min(3, len(available)))
+            return self.rng.sample(available, required)
+        return []
+
+def busy_field(notes_on_screen):
+    field = NoteField(NUM_LANES)
+    rng = random.Random(1)
+    for i in range(notes_on_screen):
+        field.add(ShortNote(rng.randrange(NUM_LANES), i * 10.0))
+    field.add(LongNote(0, NOTE_SPEED, 0.0))
+    return field
+
+def per_call(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e9
+
+def main():
+    number = 20000
+    print(f"{'benchmark':<40}{'before ns':>12}{'after ns':>12}{'speedup':>10}")
+    for notes_on_screen in (10, 100, 1000):
+        field = busy_field(notes_on_screen)
+        rows = []
+        for name, make_call in (
+            ("select_pattern", lambda logic: logic.select_pattern),
+            ("get_spawn_interval", lambda logic: logic.get_spawn_interval),
+            ("get_available_lanes", lambda logic: lambda: logic.get_available_lanes(5000, 'double', field)),
+            ("generate_notes", lambda logic: lambda: logic.generate_notes(5000, field)),
+        ):
+            legacy = LegacyNoteLogic(CONFIG, rng=random.Random(7))
+            current = NoteLogic(CONFIG, rng=random.Random(7))
+            # generate_notes is timed on its no-spawn path, which is what nearly every frame runs
+            legacy.spawn_time = current.spawn_time = 5000
+            before = per_call(make_call(legacy), number)
+            after = per_call(make_call(current), number)
+            rows.append((f"{name} ({notes_on_screen} notes)", before, after))
+        for label, before, after in rows:
+            print(f"{label:<40}{before:>12.0f}{after:>12.0f}{before / after:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""Rendering and simulation benchmark suite; results are saved as JSON to compare commits.
+
+Runs headless by default (SDL_VIDEODRIVER=dummy). From the repository root:
+
+    python bench/bench_suite.py                      # every scenario
+    python bench/bench_suite.py notes_200 main_menu  # a subset
+    python bench/bench_suite.py --compare bench/results/OLD.json
+
+Each scenario drives the same code game() runs per frame (draw_scene and
+update_effects from main, the simulation and its note source, presented
+through a DirtyRenderer) without the frame-rate cap. It is timed without
+tracing first; a second, shorter pass under tracemalloc records two memory
+figures per frame on the Python heap (pixel buffers of pygame surfaces are
+not traced):
+
+    heap_peak_bytes_per_frame   median of how far the traced heap rose above
+                                its level at the start of the frame; garbage
+                                freed before more is allocated overlaps, so
+                                this is not the total allocated
+    retained_blocks_per_frame   mean change in allocated memory blocks from
+                                the start to the end of a frame
+
+Neither counts allocations: a frame that allocates and frees 10k small
+temporaries one after another shows up as roughly one object's size and 0
+blocks.
+
+--render-mode picks dirty-rectangle or full-flip presentation, for the
+menus too.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+os.chdir(ROOT)  # Assets are loaded relative to the repository root
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+import main
+import menu
+import dirty_rects
+from simulation import GameSimulation
+from charts import ChartNoteSource
+from autoplay import AutoPlayer, stress_note_logic
+from objects import ShortNote, LongNote, SPAWN_X, clear_popups
+from config import HIT_ZONE_X, NOTE_SPEED, NUM_LANES, RUSH_MAX, MAX_PARTICLES, lane_positions, lane_colors
+
+FRAME_MS = 1000 / 60    # Song time per frame in the scenarios that simulate
+WARMUP_FRAMES = 30
+ALLOC_FRAMES = 60
+
+# --------------------------
+# Scenarios
+# --------------------------
+#
+# A scenario is a function returning a frame callable; every call renders and
+# presents one frame.
+
+def _present(renderer, sim, alpha):
+    renderer.begin(main.screen, main.track_layer(main.screen))
+    renderer.mark_all(main.draw_scene(main.screen, sim, alpha))
+    renderer.present(main.screen)
+
+def _reset_effects():
+    main.particles.clear()
+    main.particles.seed(0)
+    clear_popups(main.hit_popups)
+
+def _static_field(count, long_share, seed=0):
+    """A simulation holding `count` notes spread over the visible track and spawning nothing more."""
+    sim = GameSimulation(ChartNoteSource(()), seed=seed)
+    rng = random.Random(seed)
+    visible_ms = (SPAWN_X - HIT_ZONE_X) / NOTE_SPEED * 1000
+    notes = []
+    for _ in range(count):
+        lane = rng.randrange(NUM_LANES)
+        hit_time = rng.uniform(0, visible_ms)
+        if rng.random() < long_share:
+            notes.append(LongNote(lane, rng.uniform(0.5, 1.5) * NOTE_SPEED, hit_time))
+        else:
+            notes.append(ShortNote(lane, hit_time))
+    notes.sort(key=lambda note: note.hit_time)
+    sim.note_field.extend(notes)
+    return sim
+
+def notes_scenario(count, long_share):
+    def setup():
+        _reset_effects()
+        sim = _static_field(count, long_share)
+        renderer = dirty_rects.DirtyRenderer()
+        frame = 0
+
+        def run():
+            nonlocal frame
+            frame += 1
+            _present(renderer, sim, (frame % 60) / 60)  # Notes sway within one step
+        return run
+    return setup
+
+def _played(source, rush=False, seed=0):
+    """Autoplay `source` in a full simulation, one FRAME_MS of song time per frame."""
+    def setup():
+        _reset_effects()
+        sim = GameSimulation(seed=seed)
+        player = AutoPlayer(seed=seed, source=source()).attach(sim)
+        renderer = dirty_rects.DirtyRenderer()
+        song_time = 0.0
+
+        def run():
+            nonlocal song_time
+            song_time += FRAME_MS
+            if rush:
+                sim.rush_meter, sim.in_rush_mode = RUSH_MAX, True
+            player.feed(song_time)
+            alpha = sim.advance(song_time)
+            for event in sim.drain_events():
+                main.show_judgement(event)
+            main.update_effects(FRAME_MS / 1000)
+            _present(renderer, sim, alpha)
+
+        for _ in range(240):  # Play into the song so the field is full
+            run()
+        return run
+    return setup
+
+def chord_logic(seed=0):
+    """Max-difficulty spawner that only rolls chords and bursts."""
+    logic = stress_note_logic(seed, spawn_interval=120, long_notes=False)
+    weights = [{'double': 40, 'triple': 30, 'burst': 30}.get(p['type'], 0) for p in logic.patterns]
+    intervals, cooldown = logic.spawn_intervals, logic.min_spawn_interval
+    logic.build_tables({level: weights for level in range(logic.MAX_DIFFICULTY + 1)})
+    logic.spawn_intervals, logic.min_spawn_interval = intervals, cooldown
+    return logic
+
+def particles_scenario():
+    _reset_effects()
+    sim = GameSimulation(ChartNoteSource(()))
+    renderer = dirty_rects.DirtyRenderer()
+
+    def run():
+        # Keep the pool at capacity: top it up with bursts at every lane
+        lane = 0
+        while len(main.particles) < MAX_PARTICLES:
+            main.particles.emit((HIT_ZONE_X, lane_positions[lane]), lane_colors[lane])
+            lane = (lane + 1) % NUM_LANES
+        main.update_effects(FRAME_MS / 1000)
+        _present(renderer, sim, 0.0)
+    return run
+
+class _SceneDone(Exception):
+    pass
+
+def menu_scenario(menu_function):
+    """Run a blocking menu loop; the harness ends it by raising from the display flip or update."""
+    def setup():
+        return lambda: menu_function(main.screen)
+    setup.blocking = True
+    return setup
+
+SCENARIOS = {
+    "notes_50": notes_scenario(50, 0.0),
+    "notes_200": notes_scenario(200, 0.0),
+    "notes_800": notes_scenario(800, 0.0),
+    "long_notes_100": notes_scenario(100, 1.0),
+    "chords_bursts": _played(chord_logic),
+    "rush_mode": _played(lambda: stress_note_logic(0, spawn_interval=250), rush=True),
+    "max_particles": particles_scenario,
+    "main_menu": menu_scenario(menu.main_menu),
+    "song_select_menu": menu_scenario(menu.song_select_menu),
+}
+
+# --------------------------
+# Harness
+# --------------------------
+
+def _time_frames(setup, frames):
+    """Frame times in ms of `frames` frames after the warm-up."""
+    times = []
+    if getattr(setup, "blocking", False):
+        flip, update = pygame.display.flip, pygame.display.update
+        last = None
+
+        def timed_flip(*rects):
+            nonlocal last
+            if rects:
+                update(*rects)
+            else:
+                flip()
+            now = time.perf_counter()
+            if last is not None:
+                times.append((now - last) * 1000)
+            last = now
+            if len(times) >= frames + WARMUP_FRAMES:
+                raise _SceneDone
+        pygame.display.flip = pygame.display.update = timed_flip
+        try:
+            setup()()
+        except _SceneDone:
+            pass
+        finally:
+            pygame.display.flip, pygame.display.update = flip, update
+        return times[WARMUP_FRAMES:]
+
+    run = setup()
+    for _ in range(WARMUP_FRAMES):
+        run()
+    for _ in range(frames):
+        start = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+def _trace_allocations(setup, frames):
+    """Per frame: peak traced heap growth in bytes and the net change in allocated blocks."""
+    peaks, blocks = [], []
+    if getattr(setup, "blocking", False):
+        flip, update = pygame.display.flip, pygame.display.update
+        count = start = start_blocks = 0
+
+        def traced_flip(*rects):
+            nonlocal count, start, start_blocks
+            if rects:
+                update(*rects)
+            else:
+                flip()
+            count += 1
+            if count > WARMUP_FRAMES:
+                peaks.append(tracemalloc.get_traced_memory()[1] - start)
+                blocks.append(sys.getallocatedblocks() - start_blocks)
+                if len(peaks) >= frames:
+                    raise _SceneDone
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            start_blocks = sys.getallocatedblocks()
+        pygame.display.flip = pygame.display.update = traced_flip
+        tracemalloc.start()
+        try:
+            setup()()
+        except _SceneDone:
+            pass
+        finally:
+            pygame.display.flip, pygame.display.update = flip, update
+            tracemalloc.stop()
+        return peaks, blocks
+
+    run = setup()
+    for _ in range(WARMUP_FRAMES):
+        run()
+    tracemalloc.start()
+    for _ in range(frames):
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        start_blocks = sys.getallocatedblocks()
+        run()
+        peaks.append(tracemalloc.get_traced_memory()[1] - start)
+        blocks.append(sys.getallocatedblocks() - start_blocks)
+    tracemalloc.stop()
+    return peaks, blocks
+
+def run_scenario(name, frames):
+    setup = SCENARIOS[name]
+    collections = sum(stats["collections"] for stats in gc.get_stats())
+    times = np.array(_time_frames(setup, frames))
+    collections = sum(stats["collections"] for stats in gc.get_stats()) - collections
+    peaks, blocks = _trace_allocations(setup, ALLOC_FRAMES)
+    p50, p95, p99 = np.percentile(times, (50, 95, 99))
+    return {
+        "frames": len(times),
+        "fps": round(1000 / float(times.mean()), 1),
+        "frame_ms": {"mean": round(float(times.mean()), 3), "p50": round(float(p50), 3),
+                     "p95": round(float(p95), 3), "p99": round(float(p99), 3), "max": round(float(times.max()), 3)},
+        "heap_peak_bytes_per_frame": int(np.median(peaks)),
+        "retained_blocks_per_frame": round(float(np.mean(blocks)), 1),
+        "gc_collections": collections,
+    }
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(results, baseline):
+    print(f"\n{'scenario':<20}{'fps before':>12}{'fps after':>12}{'change':>9}")
+    for name, result in results["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before:
+            change = (result["fps"] / before["fps"] - 1) * 100
+            print(f"{name:<20}{before['fps']:>12.1f}{result['fps']:>12.1f}{change:>+8.1f}%")
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark Jazz Hero rendering and simulation workloads.")
+    parser.add_argument("scenarios", nargs="*", help=f"scenarios to run (default: all): {', '.join(SCENARIOS)}")
+    parser.add_argument("--frames", type=int, default=300, help="timed frames per scenario")
+    parser.add_argument("--out", help="result file (default: bench/results/<commit>.json)")
+    parser.add_argument("--compare", help="earlier result file to compare FPS against")
+    parser.add_argument("--render-mode", choices=("dirty", "full"), default="dirty",
+                        help="present changed rectangles only, or flip every whole frame")
+    args = parser.parse_args()
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    # The menus start their music when nothing is playing; audio is not part of the benchmark
+    pygame.mixer.music.get_busy = lambda: True
+    menu.FPS = 0  # Uncapped clock.tick in the menu loops
+    dirty_rects.RENDER_MODE = args.render_mode
+
+    commit = _commit()
+    results = {
+        "commit": commit,
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "video_driver": pygame.display.get_driver(),
+        "render_mode": args.render_mode,
+        "scenarios": {},
+    }
+    print(f"{'scenario':<20}{'fps':>9}{'p50 ms':>9}{'p99 ms':>9}{'heap peak KiB':>15}{'kept blocks':>13}")
+    for name in args.scenarios or SCENARIOS:
+        result = results["scenarios"][name] = run_scenario(name, args.frames)
+        print(f"{name:<20}{result['fps']:>9.1f}{result['frame_ms']['p50']:>9.2f}{result['frame_ms']['p99']:>9.2f}"
+              f"{result['heap_peak_bytes_per_frame'] / 1024:>15.1f}{result['retained_blocks_per_frame']:>13.1f}")
+
+    out = args.out or os.path.join("bench", "results", f"{commit}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"saved {out}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+if __name__ == "__main__":
+    main_cli()
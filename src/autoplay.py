@@ -0,0 +1,288 @@
+import argparse
+import heapq
+import math
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+from simulation import GameSimulation
+from note_logic import NoteLogic
+from charts import ChartNoteSource
+from particles import ParticleSystem
+from objects import HitPopup, LongNote, update_popups, pool_stats
+from play_gc import PlayGC
+from replay import Replay, simulate_replay
+from config import SPAWN_INTERVAL, NUM_LANES, NOTE_SPEED, HIT_ZONE_X, RATING_COLORS, lane_positions, lane_colors
+
+# --------------------------
+# Autoplay
+# --------------------------
+
+TIMINGS = ("perfect", "gaussian", "misses")
+SHORT_PRESS_MS = 30       # How long the bot holds a key for a short note
+LOAD_BUCKET = 50          # Notes on the field per row of the frame-time report
+CALIBRATED_SCORE_TOLERANCE = 0.02  # Share a calibrated late player's score may differ from on time
+
+class AutoPlayer:
+    """Plays every note a note source spawns by queueing lane input ahead of time.
+
+    Wraps the note source of a simulation, so every note is seen the moment it
+    spawns, and schedules its press (and release) with a timing error drawn
+    from the chosen distribution:
+
+        perfect   always on the beat
+        gaussian  normally distributed error of `sigma` ms around `bias` ms
+        misses    like gaussian, but each note is skipped with `miss_rate`
+
+    feed() hands the scheduled input over to the simulation up to a song time;
+    call it before advancing the simulation to that time.
+    """
+
+    def __init__(self, timing="perfect", sigma=20, bias=0, miss_rate=0.1, seed=None, source=None, duration_ms=None):
+        if timing not in TIMINGS:
+            raise ValueError(f"unknown timing {timing!r}, expected one of {', '.join(TIMINGS)}")
+        self.timing = timing
+        self.sigma = sigma
+        self.bias = bias
+        self.miss_rate = miss_rate
+        self.rng = random.Random(seed)
+        self.source = source
+        self.duration_ms = duration_ms
+        self.sim = None
+        self.planned = []  # Heap of (time_ms, order, lane, pressed)
+        self.order = 0
+        self.skipped = 0
+        # Frame time per note-field load: bucket -> [frames, total_ms, worst_ms]
+        self.frame_load = {}
+        self.last_feed = None
+
+    def attach(self, sim):
+        """Take over the note source of `sim`, or give it ours if one was passed in."""
+        self.sim = sim
+        if self.source is None:
+            self.source = sim.note_generator
+        sim.note_generator = self
+        return self
+
+    @property
+    def finished(self):
+        return self.source.finished
+
+    def time_up(self, sim):
+        return self.duration_ms is not None and sim.time >= self.duration_ms
+
+    def _error(self):
+        if self.timing == "perfect":
+            return 0
+        return self.rng.gauss(self.bias, self.sigma)
+
+    def _plan(self, time_ms, lane, pressed):
+        heapq.heappush(self.planned, (round(time_ms), self.order, lane, pressed))
+        self.order += 1
+
+    def generate_notes(self, current_time, note_field):
+        notes = self.source.generate_notes(current_time, note_field)
+        for note in notes:
+            if self.timing == "misses" and self.rng.random() < self.miss_rate:
+                self.skipped += 1
+                continue
+            press = note.hit_time + self._error()
+            self._plan(press, note.lane, True)
+            if isinstance(note, LongNote):
+                self._plan(max(note.tail_time + self._error(), press + 1), note.lane, False)
+            else:
+                self._plan(press + SHORT_PRESS_MS, note.lane, False)
+        return notes
+
+    def feed(self, song_time):
+        """Queue every planned input due by song_time on the simulation."""
+        planned = self.planned
+        sim = self.sim
+        while planned and planned[0][0] <= song_time:
+            input_time, _, lane, pressed = heapq.heappop(planned)
+            sim.queue_input(lane, pressed, input_time)
+
+        now = time.perf_counter()
+        if self.last_feed is not None:
+            frame_ms = (now - self.last_feed) * 1000
+            load = self.frame_load.setdefault(len(sim.note_field) // LOAD_BUCKET, [0, 0.0, 0.0])
+            load[0] += 1
+            load[1] += frame_ms
+            load[2] = max(load[2], frame_ms)
+        self.last_feed = now
+
+    def load_report(self):
+        """Mean and worst frame time against the number of notes on the field."""
+        lines = ["notes on field   frames   mean ms   worst ms"]
+        for bucket in sorted(self.frame_load):
+            frames, total, worst = self.frame_load[bucket]
+            lines.append(f"{bucket * LOAD_BUCKET:>6}-{(bucket + 1) * LOAD_BUCKET - 1:<7}  {frames:>7}  "
+                         f"{total / frames:>8.2f}  {worst:>9.2f}")
+        return "\n".join(lines)
+
+def chart_note_logic(seed=None):
+    return NoteLogic({
+        'SPAWN_INTERVAL': SPAWN_INTERVAL,
+        'NUM_LANES': NUM_LANES,
+        'NOTE_SPEED': NOTE_SPEED
+    }, rng=random.Random(seed))
+
+def stress_note_logic(seed=None, spawn_interval=0, long_notes=True):
+    """NoteLogic locked at max difficulty with its spawn interval and lane cooldown replaced.
+
+    spawn_interval=0 removes the cap entirely: every free lane gets a note on
+    every fixed step. Long notes keep their lane blocked until they scroll off,
+    so long_notes=False is what lets the field fill up completely.
+    """
+    logic = chart_note_logic(seed)
+    if not long_notes:
+        weights = [0 if p['type'] == 'long' else p['weight'] for p in logic.patterns]
+        logic.build_tables({level: weights for level in range(NoteLogic.MAX_DIFFICULTY + 1)})
+    logic.current_difficulty = NoteLogic.MAX_DIFFICULTY
+    logic.spawn_intervals = [spawn_interval] * len(logic.spawn_intervals)
+    logic.min_spawn_interval = spawn_interval
+    return logic
+
+# --------------------------
+# Headless Soak Run
+# --------------------------
+
+def soak(player, duration_ms, report_every_ms=60000, seed=None):
+    """Autoplay headlessly with the game's particle and popup effects, printing live object counts.
+
+    Memory is traced with tracemalloc so growth in notes, chords, particles or
+    popups over a long run shows up in the reports.
+    """
+    sim = GameSimulation(seed=seed)
+    player.attach(sim)
+    particles = ParticleSystem()
+    particles.seed(seed)
+    hit_popups = deque()
+    dt = sim.step_ms / 1000
+
+    play_gc = PlayGC()
+    play_gc.start()
+    tracemalloc.start()
+    start = time.perf_counter()
+    next_report = report_every_ms
+    baseline = None
+    print("song time   notes  chords  particles  popups  pending   memory KiB")
+    while sim.time < duration_ms:
+        player.feed(sim.time + sim.step_ms)
+        sim.step()
+        for event in sim.drain_events():
+            if event.kind != "miss":
+                y = lane_positions[event.lane]
+                particles.emit((HIT_ZONE_X, y), lane_colors[event.lane])
+                hit_popups.append(HitPopup.pool.acquire(event.rating, (HIT_ZONE_X, y - 30), RATING_COLORS[event.rating]))
+        particles.update()
+        update_popups(hit_popups, dt)
+        sim.input_log.clear()  # Soak runs are never saved as replays
+
+        if sim.time >= next_report:
+            next_report += report_every_ms
+            memory = tracemalloc.get_traced_memory()[0] / 1024
+            baseline = memory if baseline is None else baseline
+            print(f"{sim.time / 1000:>8.0f}s  {len(sim.note_field):>6}  {len(sim.note_field.chords):>6}  "
+                  f"{len(particles):>9}  {len(hit_popups):>6}  {len(player.planned):>7}  "
+                  f"{memory:>11.0f} ({memory - baseline:+.0f})")
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    play_gc.stop()
+    print(f"{duration_ms / 1000:.0f}s of play in {elapsed:.1f}s, score {sim.score}, "
+          f"{player.skipped} notes skipped on purpose")
+    print(f"gc ({play_gc.mode}): {play_gc.stats()['collections']} collections; pool hit rates: " +
+          ", ".join(f"{name} {stats['hit_rate'] * 100:.1f}% of {stats['acquired']}" for name, stats in pool_stats().items()))
+    return sim
+
+# --------------------------
+# Live Session Replay Check
+# --------------------------
+
+def live_session(player, duration_ms, input_offset=0, seed=None, frame_ms=(2, 25), latency=None, start_ms=0.0):
+    """Autoplay through the game loop's input path and return the finished simulation.
+
+    The bot's keys go down `latency` ms late (input_offset unless given) and
+    are read once per frame of random length, then queued at the frame's
+    calibrated input time, the same way game() queues keyboard input. Frames
+    start at song time `start_ms`.
+    """
+    latency = input_offset if latency is None else latency
+    sim = GameSimulation(seed=seed, input_delay=max(round(input_offset), 0))
+    player.attach(sim)
+    rng = random.Random(seed)
+    planned = player.planned
+    song_time = start_ms
+    while sim.time < duration_ms and not sim.song_over():
+        song_time += rng.uniform(*frame_ms)
+        input_time = max(round(song_time - input_offset), 0)
+        while planned and planned[0][0] + latency <= song_time:
+            _, _, lane, pressed = heapq.heappop(planned)
+            sim.queue_input(lane, pressed, input_time)
+        sim.advance(song_time)
+        sim.events.clear()
+    return sim
+
+def check_replays(sessions, duration_ms, input_offset=0, seed=0, **timing):
+    """Play live sessions and check their replays and calibration; returns the number of failures.
+
+    Each session's replay must re-simulate to the live score, and a player
+    `input_offset` ms late with that offset calibrated must score within
+    CALIBRATED_SCORE_TOLERANCE of the same player on time.
+    """
+    failures = 0
+    for i in range(sessions):
+        sim = live_session(AutoPlayer(seed=seed + i, **timing), duration_ms, input_offset, seed + i)
+        replay = Replay.decode(Replay.from_simulation(sim).encode())
+        simulated = simulate_replay(replay).score
+        if simulated != sim.score:
+            failures += 1
+            print(f"seed {seed + i}: MISMATCH live {sim.score}, simulated {simulated}")
+        # A finite chart, so the late player's last inputs are not cut off at duration_ms, and
+        # frames input_offset ms earlier on time, so both players' keys are read equally late
+        chart = chart_note_logic(seed + i).generate_chart(duration_ms, seed + i)
+        late, on_time = (live_session(AutoPlayer(seed=seed + i, source=ChartNoteSource(chart), **timing),
+                                      math.inf, offset, seed + i, start_ms=offset - input_offset).score
+                         for offset in (input_offset, 0))
+        if abs(late - on_time) > on_time * CALIBRATED_SCORE_TOLERANCE:
+            failures += 1
+            print(f"seed {seed + i}: CALIBRATION calibrated late player {late}, on time {on_time}")
+    print(f"{sessions} sessions with a {input_offset:g} ms input offset, {failures} failures")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Autoplay Jazz Hero to stress the game and check for leaks.")
+    parser.add_argument("--timing", choices=TIMINGS, default="perfect")
+    parser.add_argument("--sigma", type=float, default=20, help="timing error standard deviation in ms")
+    parser.add_argument("--bias", type=float, default=0, help="mean timing error in ms (positive is late)")
+    parser.add_argument("--miss-rate", type=float, default=0.1, help="share of notes skipped with --timing misses")
+    parser.add_argument("--spawn-interval", type=float, default=0,
+                        help="ms between spawns at max difficulty; 0 spawns on every step")
+    parser.add_argument("--no-long-notes", action="store_true", help="spawn only short notes")
+    parser.add_argument("--duration", type=float, default=60, help="minutes of song time to play")
+    parser.add_argument("--report-every", type=float, default=60, help="seconds of song time between reports")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--render", action="store_true", help="play in the game window and report frame times")
+    parser.add_argument("--check-replays", type=int, metavar="SESSIONS",
+                        help="play this many live-style sessions and check their replays and input calibration")
+    parser.add_argument("--input-offset", type=float, default=60, help="calibration offset in ms for --check-replays")
+    args = parser.parse_args()
+
+    if args.check_replays:
+        failures = check_replays(args.check_replays, args.duration * 60000, args.input_offset, args.seed,
+                                 timing=args.timing, sigma=args.sigma, bias=args.bias, miss_rate=args.miss_rate)
+        sys.exit(1 if failures else 0)
+
+    player = AutoPlayer(args.timing, args.sigma, args.bias, args.miss_rate, seed=args.seed,
+                        source=stress_note_logic(args.seed, args.spawn_interval, not args.no_long_notes),
+                        duration_ms=args.duration * 60000)
+    if args.render:
+        from main import game  # Opens the game window
+        game(seed=args.seed, autoplay=player)
+        print(player.load_report())
+    else:
+        soak(player, args.duration * 60000, args.report_every * 1000, args.seed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import json
+import os
+import statistics
+import sys
+import numpy as np
+import pygame
+from fonts import draw_text
+from utils import draw_gradient_background
+from frame_pacing import FrameScheduler
+from config import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, GAMEPLAY_FPS, UI, MENU_BACKGROUND, main_keys,
+    CALIBRATION_FILE, CALIBRATION_BEAT_MS, CALIBRATION_TAPS
+)
+
+# --------------------------
+# Input Offset
+# --------------------------
+#
+# The offset is how late, in ms, the player's taps land after what they see
+# and hear. The game subtracts it from every input timestamp before judging.
+
+LEAD_IN_BEATS = 4      # Beats played before taps start counting
+IGNORED_TAPS = 2       # First taps are usually off while the player settles in
+
+def load_input_offset(path=CALIBRATION_FILE):
+    if not os.path.exists(path):
+        return 0.0
+    with open(path) as f:
+        return float(json.load(f).get("input_offset_ms", 0.0))
+
+def save_input_offset(offset_ms, path=CALIBRATION_FILE):
+    with open(path, "w") as f:
+        json.dump({"input_offset_ms": round(offset_ms, 1)}, f)
+
+def _click_sound():
+    """A short decaying tick for the metronome, or None without a usable mixer."""
+    init = pygame.mixer.get_init()
+    if not init or init[1] != -16:
+        return None
+    frequency, _, channels = init
+    t = np.arange(int(frequency * 0.03)) / frequency
+    wave = (np.sin(2 * np.pi * 1500 * t) * np.exp(-t * 150) * 20000).astype(np.int16)
+    if channels > 1:
+        wave = np.repeat(wave[:, None], channels, axis=1)
+    return pygame.sndarray.make_sound(np.ascontiguousarray(wave))
+
+# --------------------------
+# Calibration Screen
+# --------------------------
+
+def calibration_screen(screen):
+    """Metronome with a flashing beat; the player taps along and the median error becomes the offset.
+
+    Returns the new offset in ms, or None if the player left with Esc.
+    """
+    scheduler = FrameScheduler(GAMEPLAY_FPS)  # Taps are timed once per frame, so run at the gameplay rate
+    bg_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    draw_gradient_background(bg_surface, MENU_BACKGROUND[0], MENU_BACKGROUND[1])
+    click = _click_sound()
+    tap_keys = {pygame.key.key_code(key) for key in main_keys} | {pygame.K_SPACE}
+    center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+
+    errors = []
+    offset = None
+    start = pygame.time.get_ticks()
+    last_beat = -1
+
+    while True:
+        scheduler.tick()
+        now = pygame.time.get_ticks() - start
+        beat = now // CALIBRATION_BEAT_MS
+        if beat != last_beat:
+            last_beat = beat
+            if click is not None and offset is None:
+                click.play()
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                sys.exit()
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    return None
+                if offset is not None:
+                    if event.key == pygame.K_RETURN:
+                        save_input_offset(offset)
+                        return offset
+                    if event.key == pygame.K_r:  # Start over
+                        errors.clear()
+                        offset = None
+                        start = pygame.time.get_ticks()
+                        last_beat = -1
+                elif event.key in tap_keys and now >= LEAD_IN_BEATS * CALIBRATION_BEAT_MS:
+                    nearest = round(now / CALIBRATION_BEAT_MS) * CALIBRATION_BEAT_MS
+                    errors.append(now - nearest)
+                    if len(errors) >= CALIBRATION_TAPS + IGNORED_TAPS:
+                        offset = statistics.median(errors[IGNORED_TAPS:])
+
+        screen.blit(bg_surface, (0, 0))
+        draw_text(screen, "Calibration", (255, 255, 255), UI["title_font"], 72, centerx=SCREEN_WIDTH // 2, y=80)
+        if offset is None:
+            # Flash on the beat, fading out over the first half of it
+            fade = max(0.0, 1 - (now % CALIBRATION_BEAT_MS) / (CALIBRATION_BEAT_MS / 2))
+            color = [int(a + (b - a) * fade) for a, b in zip(UI["accent_color"], (255, 255, 255))]
+            pygame.draw.circle(screen, color, center, 60 + int(20 * fade))
+            if now < LEAD_IN_BEATS * CALIBRATION_BEAT_MS:
+                message = "Get ready..."
+            else:
+                message = f"Tap {' / '.join(k.upper() for k in main_keys)} or Space on the beat  " \
+                          f"({max(len(errors) - IGNORED_TAPS, 0)}/{CALIBRATION_TAPS})"
+            draw_text(screen, message, (230, 230, 230), UI["body_font"], 32, centerx=SCREEN_WIDTH // 2, y=SCREEN_HEIGHT - 200)
+        else:
+            draw_text(screen, f"Offset: {offset:+.0f} ms", (255, 255, 255), UI["title_font"], 64, center=center)
+            draw_text(screen, "Enter to save, R to retry, Esc to cancel", (230, 230, 230), UI["body_font"], 32,
+                      centerx=SCREEN_WIDTH // 2, y=SCREEN_HEIGHT - 200)
+        pygame.display.flip()
@@ -0,0 +1,122 @@
+import hashlib
+import mmap
+import os
+import tempfile
+import numpy as np
+from charts import ChartEntry, HEADER, RECORD, CHART_MAGIC, read_text_chart, write_binary_chart
+from config import CHART_CACHE_DIR, NUM_LANES
+
+# NumPy view of the compiled record layout in charts.RECORD
+CHART_DTYPE = np.dtype([
+    ("time", "<f8"),
+    ("lane", "u1"),
+    ("type", "u1"),
+    ("length", "<f4"),
+    ("chord", "<u4"),
+])
+assert CHART_DTYPE.itemsize == RECORD.size
+
+ENTRY_CHUNK = 512  # records converted to ChartEntry tuples at a time
+
+# --------------------------
+# Compiled Chart Cache
+# --------------------------
+
+def chart_hash(path):
+    """Content hash of a chart file, used as its cache key."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def compiled_chart_path(src, cache_dir=CHART_CACHE_DIR):
+    """Return the cached compiled form of a text chart, compiling it if its content changed.
+
+    Each compile writes its own temporary file and renames it into place, so
+    processes filling a cold cache at the same time (replay verification
+    workers) never see or replace a half-written chart.
+    """
+    dst = os.path.join(cache_dir, chart_hash(src) + ".jhc")
+    if not os.path.exists(dst):
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            write_binary_chart(read_text_chart(src), tmp)
+            os.replace(tmp, dst)
+        except BaseException:
+            os.remove(tmp)
+            raise
+    return dst
+
+class MappedChart:
+    """A compiled chart memory-mapped and viewed as a NumPy structured array without copying.
+
+    lane_records[lane] holds the record indices of each lane and lane_times[lane]
+    their timestamps, so seeking to a song position is a binary search.
+    close() it, or use it as a context manager, once the session is over.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, count = HEADER.unpack(f.read(HEADER.size))
+            if magic != CHART_MAGIC:
+                raise ValueError(f"{path}: not a compiled chart")
+            if count:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self.records = np.frombuffer(self._map, dtype=CHART_DTYPE, count=count, offset=HEADER.size)
+            else:
+                self._map = None
+                self.records = np.zeros(0, dtype=CHART_DTYPE)
+
+        self.times = self.records["time"]
+        if np.any(np.diff(self.times) < 0):
+            raise ValueError(f"{path}: chart entries are not sorted by time")
+        lanes = self.records["lane"]
+        self.lane_records = [np.flatnonzero(lanes == lane) for lane in range(NUM_LANES)]
+        self.lane_times = [self.times[index] for index in self.lane_records]
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def duration(self):
+        return float(self.times[-1]) if len(self.times) else 0.0
+
+    def seek(self, time):
+        """Index of the first record at or after `time`."""
+        return int(np.searchsorted(self.times, time, side="left"))
+
+    def seek_lane(self, lane, time):
+        """Record index of the first note in a lane at or after `time`, or None past the end."""
+        i = int(np.searchsorted(self.lane_times[lane], time, side="left"))
+        index = self.lane_records[lane]
+        return int(index[i]) if i < len(index) else None
+
+    def entries(self, start_time=0):
+        """Yield ChartEntry records from start_time onwards, converting a chunk at a time."""
+        start = self.seek(start_time)
+        for chunk_start in range(start, len(self.records), ENTRY_CHUNK):
+            for row in self.records[chunk_start:chunk_start + ENTRY_CHUNK].tolist():
+                yield ChartEntry(*row)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.records = self.times = None
+        self.lane_records = self.lane_times = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+def load_chart(path, cache_dir=CHART_CACHE_DIR):
+    """Map a chart for playback; text charts go through the content-hashed compile cache."""
+    if not path.endswith(".jhc"):
+        path = compiled_chart_path(path, cache_dir)
+    return MappedChart(path)
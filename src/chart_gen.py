@@ -0,0 +1,45 @@
+import argparse
+import os
+import time
+from note_logic import NoteLogic
+from charts import write_text_chart, write_binary_chart
+from config import SPAWN_INTERVAL, NUM_LANES, NOTE_SPEED
+
+def parse_curve(text):
+    """Parse a difficulty curve written as "start_ms:level,start_ms:level,..."."""
+    curve = []
+    for point in text.split(","):
+        start, level = point.split(":")
+        curve.append((float(start), int(level)))
+    return sorted(curve)
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate seeded Infinite Mode charts.")
+    parser.add_argument("--count", type=int, default=100, help="number of charts to generate")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first chart; later ones count up")
+    parser.add_argument("--duration", type=float, default=180, help="chart length in seconds")
+    parser.add_argument("--curve", type=parse_curve, default=None,
+                        help='difficulty curve as "start_ms:level,..." (default: +1 level every 30s)')
+    parser.add_argument("--format", choices=("jhc", "chart"), default="jhc")
+    parser.add_argument("--out", default="cache/generated", help="output directory")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    note_logic = NoteLogic({
+        'SPAWN_INTERVAL': SPAWN_INTERVAL,
+        'NUM_LANES': NUM_LANES,
+        'NOTE_SPEED': NOTE_SPEED
+    })
+    write = write_binary_chart if args.format == "jhc" else write_text_chart
+
+    start = time.perf_counter()
+    notes = 0
+    for seed in range(args.seed, args.seed + args.count):
+        entries = note_logic.generate_chart(args.duration * 1000, seed, args.curve)
+        write(entries, os.path.join(args.out, f"infinite_{seed}.{args.format}"))
+        notes += len(entries)
+    elapsed = time.perf_counter() - start
+    print(f"{args.count} charts, {notes} notes in {elapsed:.2f}s -> {args.out}")
+
+if __name__ == "__main__":
+    main()
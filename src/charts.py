@@ -0,0 +1,187 @@
+import argparse
+import os
+import struct
+from collections import deque, namedtuple
+from objects import ShortNote, LongNote, NOTE_LEAD_TIME
+from config import NOTE_SPEED, NUM_LANES, CHART_DIR, CHART_LOOKAHEAD_MS
+
+# --------------------------
+# Chart Format
+# --------------------------
+#
+# Text charts (.chart) hold one note per line, ordered by time:
+#
+#     # time_ms  lane  type   length_ms  chord
+#     1000       0     short  0          0
+#     1500       1     long   800        0
+#     2000       0     short  0          1
+#     2000       2     short  0          1
+#
+# type is "short" or "long", length_ms is the hold length of long notes and
+# chord groups notes that must all be hit together (0 means no chord). Blank
+# lines and everything after "#" are ignored. Notes in the same chord share a
+# timestamp.
+#
+# Compiled charts (.jhc) are the same entries as fixed-width little-endian
+# records after a small header, so they can be read without parsing.
+
+ChartEntry = namedtuple("ChartEntry", "time lane type length chord")
+
+NOTE_TYPES = ("short", "long")
+SHORT, LONG = 0, 1
+
+CHART_MAGIC = b"JHC1"
+HEADER = struct.Struct("<4sI")          # magic, record count
+RECORD = struct.Struct("<dBBfI")        # time_ms, lane, type, length_ms, chord
+READ_CHUNK = 256                        # records per read when streaming
+
+def read_text_chart(path):
+    """Yield ChartEntry records from a text chart one line at a time.
+
+    Entries are checked here, so a bad line fails with its line number rather
+    than when its note spawns or the chart is compiled. They must be in time
+    order: ChartNoteSource, the lane queues and MappedChart's lane search all
+    rely on it.
+    """
+    last_time = 0.0
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            fields = line.split()
+            if len(fields) != 5 or fields[2] not in NOTE_TYPES:
+                raise ValueError(f"{path}:{line_number}: expected 'time lane short|long length chord'")
+            try:
+                entry = ChartEntry(float(fields[0]), int(fields[1]), NOTE_TYPES.index(fields[2]),
+                                   float(fields[3]), int(fields[4]))
+            except ValueError:
+                raise ValueError(f"{path}:{line_number}: expected 'time lane short|long length chord'") from None
+            if not 0 <= entry.lane < NUM_LANES:
+                raise ValueError(f"{path}:{line_number}: lane {entry.lane} is not between 0 and {NUM_LANES - 1}")
+            if entry.time < 0 or entry.length < 0:
+                raise ValueError(f"{path}:{line_number}: time and length must not be negative")
+            if entry.chord < 0:
+                raise ValueError(f"{path}:{line_number}: chord must not be negative")
+            if entry.time < last_time:
+                raise ValueError(f"{path}:{line_number}: time {entry.time:g} is earlier than the previous note")
+            last_time = entry.time
+            yield entry
+
+def read_binary_chart(path):
+    """Yield ChartEntry records from a compiled chart, reading a chunk at a time."""
+    with open(path, "rb") as f:
+        magic, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != CHART_MAGIC:
+            raise ValueError(f"{path}: not a compiled chart")
+        while count > 0:
+            n = min(count, READ_CHUNK)
+            for record in RECORD.iter_unpack(f.read(n * RECORD.size)):
+                yield ChartEntry(*record)
+            count -= n
+
+def open_chart(path):
+    """Stream the entries of a text or compiled chart, chosen by file extension."""
+    if path.endswith(".jhc"):
+        return read_binary_chart(path)
+    return read_text_chart(path)
+
+def write_text_chart(entries, path):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# time_ms  lane  type  length_ms  chord\n")
+        for entry in entries:
+            f.write(f"{entry.time:g} {entry.lane} {NOTE_TYPES[entry.type]} {entry.length:g} {entry.chord}\n")
+
+def write_binary_chart(entries, path):
+    """Write entries as a compiled chart; the count is patched in once all records are written."""
+    count = 0
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(CHART_MAGIC, 0))
+        for entry in entries:
+            f.write(RECORD.pack(*entry))
+            count += 1
+        f.seek(0)
+        f.write(HEADER.pack(CHART_MAGIC, count))
+    return count
+
+def compile_chart(src, dst=None):
+    """Compile a text chart to the binary form and return the output path."""
+    dst = dst or os.path.splitext(src)[0] + ".jhc"
+    write_binary_chart(read_text_chart(src), dst)
+    return dst
+
+def list_charts(directory=CHART_DIR):
+    """Return the playable chart files in a directory, sorted by name."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.endswith((".chart", ".jhc")))
+
+def chart_title(path):
+    return os.path.splitext(os.path.basename(path))[0].replace("_", " ").title()
+
+# --------------------------
+# Streaming Note Source
+# --------------------------
+
+class ChartNoteSource:
+    """Spawns notes from a chart stream; drop-in replacement for NoteLogic in GameSimulation.
+
+    Entries are pulled from the stream only as far as CHART_LOOKAHEAD_MS past
+    the spawn horizon, and note objects are built only when they are due to
+    appear on screen, so memory stays flat however long the chart is.
+    """
+
+    def __init__(self, entries, lookahead_ms=CHART_LOOKAHEAD_MS):
+        self.entries = iter(entries)
+        self.lookahead_ms = lookahead_ms
+        self.window = deque()
+        self.exhausted = False
+
+    @property
+    def finished(self):
+        return self.exhausted and not self.window
+
+    def _fill(self, horizon):
+        window = self.window
+        while not self.exhausted and (not window or window[-1].time <= horizon):
+            entry = next(self.entries, None)
+            if entry is None:
+                self.exhausted = True
+            else:
+                window.append(entry)
+
+    def generate_notes(self, current_time, note_field):
+        spawn_horizon = current_time + NOTE_LEAD_TIME
+        self._fill(spawn_horizon + self.lookahead_ms)
+
+        new_notes = []
+        chords = {}
+        window = self.window
+        while window and window[0].time <= spawn_horizon:
+            entry = window.popleft()
+            if entry.type == LONG:
+                note = LongNote.pool.acquire(entry.lane, entry.length * NOTE_SPEED / 1000, entry.time)
+            else:
+                note = ShortNote.pool.acquire(entry.lane, entry.time)
+            new_notes.append(note)
+            if entry.chord:
+                chords.setdefault(entry.chord, []).append(note)
+
+        for members in chords.values():
+            if len(members) > 1:
+                note_field.chords.create(members)
+        return new_notes
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile Jazz Hero text charts to the binary chart format.")
+    parser.add_argument("charts", nargs="+", help="text charts to compile")
+    parser.add_argument("-o", "--output", help="output path (single input only)")
+    args = parser.parse_args()
+    if args.output and len(args.charts) > 1:
+        parser.error("--output needs exactly one input chart")
+    for src in args.charts:
+        print(compile_chart(src, args.output))
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 # Screen settings
 SCREEN_WIDTH, SCREEN_HEIGHT = 1200, 800
-FPS = 60
+FPS = 60  # Menu frame rate; gameplay runs at GAMEPLAY_FPS
 
 # Note settings
 NOTE_SPEED = 600
@@ -8,10 +8,80 @@ SPAWN_INTERVAL = 1000
 COMBO_FADE_TIME = 2000
 HIT_WINDOW = 60  # Increased hit window makes it easier to register an OK hit.
 
+NOTE_RADIUS = 20
+
 # Timing thresholds (in pixels) for grading hits
 PERFECT_THRESHOLD = 10  # Dead-center
 GOOD_THRESHOLD = 25     # Slightly off-center
 
+# The same windows in milliseconds, used when notes follow the song clock
+HIT_WINDOW_MS = HIT_WINDOW / NOTE_SPEED * 1000
+PERFECT_WINDOW_MS = PERFECT_THRESHOLD / NOTE_SPEED * 1000
+GOOD_WINDOW_MS = GOOD_THRESHOLD / NOTE_SPEED * 1000
+
+# Note timing mode: "clock" places notes from their hit timestamp and the song clock,
+# "frame" moves them by NOTE_SPEED * dt every frame
+NOTE_TIMING = "clock"
+
+# Fixed simulation timestep; rendering interpolates between steps
+SIM_STEP_MS = 1000 / 120
+MAX_SIM_STEPS_PER_FRAME = 10  # Caps catch-up work after a long hitch
+
+# Popup colors for each judgement rating
+RATING_COLORS = {
+    "Perfect!": (0, 255, 0),
+    "Good!": (255, 215, 0),
+    "OK": (255, 255, 255),
+    "Hold!": (255, 255, 255)
+}
+
+# Charts
+CHART_DIR = "assets/charts"
+CHART_CACHE_DIR = "cache/charts"  # Compiled charts keyed by a hash of their source
+CHART_LOOKAHEAD_MS = 2000   # How far past the spawn point chart entries are read ahead
+
+# Replays of finished sessions are saved here
+REPLAY_DIR = "replays"
+
+# Particle pool
+MAX_PARTICLES = 2048        # Hard cap on live particles; bursts beyond it are dropped
+PARTICLES_PER_BURST = 20
+
+# Rendering: "dirty" redraws and updates only the changed parts of the screen,
+# "full" redraws and flips every frame
+RENDER_MODE = "dirty"
+DIRTY_RECT_MAX_AREA = 0.4   # Share of the screen above which a dirty frame is flipped whole instead
+
+# Frame pacing
+GAMEPLAY_FPS = 120          # Render rate while playing; 120, 144 or 240 to match the display, or 60
+IDLE_FPS = 15               # Redraw rate when paused or in an idle menu; input still wakes the loop at once
+MENU_IDLE_AFTER_MS = 5000   # A menu without input for this long drops to IDLE_FPS
+FRAME_PACING = "hybrid"     # "sleep", "busy" (spin) or "hybrid" (sleep, then spin the last FRAME_SPIN_MS)
+FRAME_SPIN_MS = 1.0
+FRAME_STATS_WINDOW = 600    # Frame intervals the stability report covers
+
+# Object pools and garbage collection during play
+NOTE_POOL_SIZE = 512        # Despawned notes kept for reuse, per note class
+POPUP_POOL_SIZE = 64
+GC_MODE = "tuned"           # "default"; "tuned" freezes startup objects and collects less often;
+                            # "off" stops the cyclic GC while playing and collects when paused and at the end
+GC_GEN0_THRESHOLD = 10000   # Allocations between young-generation collections in "tuned" mode
+
+# Frame profiler (toggled in game with F3)
+PROFILER_ENABLED = False    # Start every session with the profiler on
+PROFILER_WINDOW = 300       # Frames the rolling percentiles cover
+PROFILER_REFRESH = 15       # Frames between overlay redraws
+PROFILE_LOG = None          # Per-frame .csv or summary .json written while profiling, e.g. "profile.csv"
+
+# Input latency
+LATENCY_WINDOW = 512                    # Samples the latency percentiles cover
+CALIBRATION_FILE = "calibration.json"   # Saved input offset from the calibration screen
+CALIBRATION_BEAT_MS = 500
+CALIBRATION_TAPS = 16
+
+# Maximum number of rendered text surfaces kept by the text cache
+TEXT_CACHE_SIZE = 256
+
 # Main keys
 main_keys = ['a', 's', 'd']
 
@@ -0,0 +1,91 @@
+import pygame
+from config import RENDER_MODE, DIRTY_RECT_MAX_AREA
+
+# --------------------------
+# Dirty-Rectangle Renderer
+# --------------------------
+
+class DirtyRenderer:
+    """Redraws and presents only the parts of the screen that changed.
+
+    A frame is drawn as: cached background, moving things, optional cached
+    foreground (panels, titles and buttons that sit on top of the animation)
+    with premultiplied alpha.
+    begin() restores the background under everything drawn last frame and
+    returns the surface to draw on, mark() records where this frame draws, and
+    present() pushes both sets of rectangles to the display. With a foreground
+    the moving things are drawn on an offscreen canvas, and present() copies
+    each rectangle from it and blends the foreground on top, so rectangles
+    that overlap are not blended twice.
+    Once the changed area passes DIRTY_RECT_MAX_AREA of the screen, or after
+    invalidate(), the whole frame is redrawn and flipped instead.
+
+    enabled defaults to RENDER_MODE == "dirty"; when off, every frame is a
+    full redraw and flip.
+    """
+
+    def __init__(self, enabled=None, max_area=DIRTY_RECT_MAX_AREA):
+        self.enabled = RENDER_MODE == "dirty" if enabled is None else enabled
+        self.max_area = max_area
+        self.previous = []
+        self.current = []
+        self.full = True
+        self.overdrawn = False
+        self.flipped = True      # Last frame went out whole; its rectangles are not worth restoring one by one
+        self.background = self.foreground = None
+        self.canvas = None
+        self.full_frames = self.partial_frames = 0
+
+    def invalidate(self):
+        """Mark the frame being drawn as covering the whole screen (an overlay, say).
+
+        It is flipped whole, and the next frame redraws the whole background.
+        """
+        self.full = self.overdrawn = True
+
+    def begin(self, surface, background, foreground=None):
+        if background is not self.background or foreground is not self.foreground:
+            self.background, self.foreground = background, foreground
+            self.full = True
+        if foreground is not None:
+            if self.canvas is None or self.canvas.get_size() != surface.get_size():
+                self.canvas = pygame.Surface(surface.get_size()).convert(surface)
+            surface = self.canvas
+        if self.full or self.flipped or not self.enabled:
+            surface.blit(background, (0, 0))
+        else:
+            for rect in self.previous:
+                surface.blit(background, rect, rect)
+        self.current = []
+        return surface
+
+    def mark(self, rect):
+        """Record a rectangle drawn this frame; returns it so draw calls can be wrapped."""
+        if rect is not None:
+            self.current.append(rect)
+        return rect
+
+    def mark_all(self, rects):
+        self.current.extend(rect for rect in rects if rect is not None)
+
+    def present(self, surface):
+        screen_rect = surface.get_rect()
+        dirty = [rect.clip(screen_rect) for rect in self.previous + self.current]
+        full = self.full or not self.enabled
+        if not full:
+            full = sum(rect.w * rect.h for rect in dirty) > screen_rect.w * screen_rect.h * self.max_area
+
+        if self.foreground is not None:
+            for rect in [screen_rect] if full else dirty:
+                surface.blit(self.canvas, rect, rect)
+                surface.blit(self.foreground, rect, rect, special_flags=pygame.BLEND_PREMULTIPLIED)
+
+        if full:
+            pygame.display.flip()
+            self.full_frames += 1
+        else:
+            pygame.display.update(dirty)
+            self.partial_frames += 1
+        self.previous = self.current
+        self.flipped = full
+        self.full, self.overdrawn = self.overdrawn, False
@@ -0,0 +1,57 @@
+import pygame
+from collections import OrderedDict
+from config import TEXT_CACHE_SIZE
+
+# --------------------------
+# Font Registry
+# --------------------------
+
+_fonts = {}
+
+def get_font(name, size, bold=False):
+    """Return a shared font; names ending in .ttf load from file, anything else is a SysFont."""
+    key = (name, size, bold)
+    font = _fonts.get(key)
+    if font is None:
+        if name.endswith(".ttf"):
+            font = pygame.font.Font(name, size)
+            font.set_bold(bold)
+        else:
+            font = pygame.font.SysFont(name, size, bold=bold)
+        _fonts[key] = font
+    return font
+
+# --------------------------
+# Text Surface Cache
+# --------------------------
+
+_text_cache = OrderedDict()
+
+def render_text(text, color, name="Segoe UI", size=36, bold=False):
+    """Render text through an LRU cache keyed by (font, size, text, color)."""
+    key = (name, size, bold, text, tuple(color))
+    surface = _text_cache.get(key)
+    if surface is not None:
+        _text_cache.move_to_end(key)
+        return surface
+    surface = get_font(name, size, bold).render(text, True, color[:3])
+    _text_cache[key] = surface
+    if len(_text_cache) > TEXT_CACHE_SIZE:
+        _text_cache.popitem(last=False)
+    return surface
+
+def draw_text(surface, text, color, name="Segoe UI", size=36, bold=False, alpha=255, **rect_kwargs):
+    """Blit cached text positioned by get_rect keyword arguments, applying alpha at blit time."""
+    text_surface = render_text(text, color, name, size, bold)
+    text_surface.set_alpha(alpha)
+    rect = text_surface.get_rect(**rect_kwargs)
+    surface.blit(text_surface, rect)
+    return rect
+
+def prewarm_text(entries):
+    """Render (text, color, name, size, bold) entries ahead of time."""
+    for text, color, name, size, bold in entries:
+        render_text(text, color, name, size, bold)
+
+def clear_text_cache():
+    _text_cache.clear()
@@ -0,0 +1,119 @@
+import time
+from collections import deque
+import numpy as np
+import pygame
+from config import IDLE_FPS, FRAME_PACING, FRAME_SPIN_MS, FRAME_STATS_WINDOW
+
+# --------------------------
+# Frame Scheduler
+# --------------------------
+
+IDLE_POLL_MS = 5         # How often an idle wait checks for queued events
+ON_TIME_MS = 1.0         # A frame interval this close to the budget counts as on time
+LATE_FRAME_FACTOR = 1.5  # An interval longer than this many budgets counts as late
+
+class FrameScheduler:
+    """Paces a loop to a target frame rate and measures how steadily it holds it.
+
+    tick() waits until the next frame is due and returns the ms since the
+    previous tick, like Clock.tick. Frames are due on a fixed cadence from the
+    previous deadline rather than from whenever the last frame ended, so
+    oversleeping one frame does not push back all the ones after it.
+
+        "sleep"   sleep the whole wait; cheapest, but only as precise as the OS timer
+        "busy"    spin the whole wait, like Clock.tick_busy_loop; precise, keeps a core busy
+        "hybrid"  sleep until FRAME_SPIN_MS before the deadline, then spin
+
+    An idle tick (paused, or a menu nobody has touched for idle_after_ms)
+    waits for the idle_fps cadence instead but returns as soon as an event is
+    queued, so the first input after a quiet spell is handled at once.
+    An fps of 0 does not wait at all.
+    """
+
+    def __init__(self, fps, idle_fps=IDLE_FPS, pacing=FRAME_PACING, idle_after_ms=None, window=FRAME_STATS_WINDOW):
+        if pacing not in ("sleep", "busy", "hybrid"):
+            raise ValueError(f"unknown frame pacing {pacing!r}")
+        self.fps = fps
+        self.budget_ms = 1000 / fps if fps else 0.0
+        self.idle_budget_ms = 1000 / idle_fps if fps and idle_fps else self.budget_ms
+        self.pacing = pacing
+        self.idle_after_ms = idle_after_ms
+        self.intervals = deque(maxlen=window)  # Intervals of the frames paced at fps
+        self.idle_frames = 0
+        self.reset()
+
+    def reset(self):
+        """Start the cadence over from now, e.g. after a loading screen."""
+        self.last = self.deadline = self.last_active = time.perf_counter()
+
+    def mark_active(self):
+        """Record user input; a loop with idle_after_ms stays at full rate for that long after it."""
+        self.last_active = time.perf_counter()
+
+    def _idle_wait(self, deadline):
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or pygame.event.peek():
+                return
+            time.sleep(min(remaining, IDLE_POLL_MS / 1000))
+
+    def _wait(self, deadline):
+        if self.pacing != "busy":
+            spin = FRAME_SPIN_MS / 1000 if self.pacing == "hybrid" else 0.0
+            remaining = deadline - time.perf_counter() - spin
+            if remaining > 0:
+                time.sleep(remaining)
+        if self.pacing != "sleep":
+            while time.perf_counter() < deadline:
+                pass
+
+    def tick(self, idle=False):
+        now = time.perf_counter()
+        if self.idle_after_ms is not None and (now - self.last_active) * 1000 > self.idle_after_ms:
+            idle = True
+        if idle:
+            self._idle_wait(self.last + self.idle_budget_ms / 1000)
+        elif self.budget_ms:
+            # Keep the cadence unless more than a whole frame behind it
+            self.deadline = max(self.deadline + self.budget_ms / 1000, now - self.budget_ms / 1000)
+            self._wait(self.deadline)
+
+        now = time.perf_counter()
+        interval_ms = (now - self.last) * 1000
+        self.last = now
+        if idle:
+            self.idle_frames += 1
+            self.deadline = now
+        else:
+            self.intervals.append(interval_ms)
+        return interval_ms
+
+    def stability(self):
+        """Achieved rate and spread of the frame intervals paced at the full rate."""
+        if not self.intervals:
+            return {}
+        intervals = np.fromiter(self.intervals, dtype=np.float64)
+        p50, p95, p99 = np.percentile(intervals, (50, 95, 99))
+        result = {
+            "target_fps": self.fps,
+            "achieved_fps": round(1000 / float(intervals.mean()), 1),
+            "interval_ms": {"p50": round(float(p50), 3), "p95": round(float(p95), 3), "p99": round(float(p99), 3),
+                            "stdev": round(float(intervals.std()), 3)},
+            "frames": len(intervals),
+            "idle_frames": self.idle_frames,
+        }
+        if self.budget_ms:
+            result["on_time"] = round(float(np.mean(np.abs(intervals - self.budget_ms) <= ON_TIME_MS)), 3)
+            result["late"] = int(np.sum(intervals > self.budget_ms * LATE_FRAME_FACTOR))
+        return result
+
+    def lines(self):
+        stats = self.stability()
+        if not stats:
+            return []
+        interval = stats["interval_ms"]
+        line = f"fps {stats['achieved_fps']:.1f} / {stats['target_fps']}  interval p50 {interval['p50']:.2f}  " \
+               f"p99 {interval['p99']:.2f}  sd {interval['stdev']:.2f} ms"
+        if "on_time" in stats:
+            return [line, f"on time {stats['on_time'] * 100:.0f}%  late {stats['late']}"]
+        return [line]
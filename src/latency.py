@@ -0,0 +1,82 @@
+import time
+from collections import deque
+import numpy as np
+from config import GAMEPLAY_FPS, LATENCY_WINDOW
+
+# --------------------------
+# Input Latency Monitor
+# --------------------------
+
+JUDGED_KINDS = ("hit", "hold", "release")
+
+class LatencyMonitor:
+    """Rolling measurements of how long input takes to be judged and shown.
+
+    SDL events carry no timestamp we can read, so a key press is only known to
+    have happened some time since the previous event poll; that poll gap is
+    recorded as the upper bound of the time an event waited in the queue.
+
+        input wait      poll gap before the event was read (upper bound)
+        input->judge    event read until its judgement came out of the simulation
+        judge->popup    judgement until the frame showing its popup was flipped
+        frame jitter    distance of each frame interval from the frame budget
+    """
+
+    def __init__(self, window=LATENCY_WINDOW, frame_budget_ms=1000 / GAMEPLAY_FPS):
+        self.frame_budget_ms = frame_budget_ms
+        self.samples = {name: deque(maxlen=window) for name in
+                        ("input wait", "input->judge", "judge->popup", "frame jitter")}
+        self.last_poll = None
+        self.wait_bound = 0.0
+        self.pending = {}   # (lane, input_time) -> (step applying it, perf_counter when the event was read)
+        self.shown = []     # perf_counter of judgements whose popup is not on screen yet
+
+    def poll(self):
+        """Call right before reading events; returns the read time to pass to input()."""
+        now = time.perf_counter()
+        if self.last_poll is not None:
+            self.wait_bound = (now - self.last_poll) * 1000
+        self.last_poll = now
+        return now
+
+    def input(self, lane, input_time, step, read_at):
+        """Record queued input; `step` is what GameSimulation.queue_input() returned for it."""
+        self.pending[(lane, input_time)] = (step, read_at)
+        self.samples["input wait"].append(self.wait_bound)
+
+    def judged(self, event):
+        """Match a judgement from the simulation to the input that caused it."""
+        now = time.perf_counter()
+        if event.kind in JUDGED_KINDS:
+            entry = self.pending.pop((event.lane, event.time), None)
+            if entry is not None:
+                self.samples["input->judge"].append((now - entry[1]) * 1000)
+        if event.kind != "miss":
+            self.shown.append(now)
+
+    def stepped(self, step_index):
+        """Forget input the simulation has applied without judging (presses on empty lanes)."""
+        if self.pending:
+            self.pending = {key: entry for key, entry in self.pending.items() if entry[0] > step_index}
+
+    def presented(self, interval_ms):
+        """Call after the display flip with the frame interval from the game clock."""
+        now = time.perf_counter()
+        if self.shown:
+            self.samples["judge->popup"].extend((now - judged) * 1000 for judged in self.shown)
+            self.shown.clear()
+        self.samples["frame jitter"].append(abs(interval_ms - self.frame_budget_ms))
+
+    def summary(self):
+        """p50/p95/p99 in ms and the sample count of every measurement."""
+        result = {}
+        for name, values in self.samples.items():
+            if values:
+                p50, p95, p99 = np.percentile(np.fromiter(values, dtype=np.float64), (50, 95, 99))
+                result[name] = {"p50": round(float(p50), 3), "p95": round(float(p95), 3), "p99": round(float(p99), 3),
+                                "samples": len(values)}
+        return result
+
+    def lines(self):
+        return [f"{name} p50 {stats['p50']:.1f}  p95 {stats['p95']:.1f}  p99 {stats['p99']:.1f} ms"
+                for name, stats in self.summary().items()]
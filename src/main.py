@@ -1,15 +1,28 @@
 import sys
+import random
+from collections import deque
 import pygame
-from note_logic import NoteLogic
-from objects import ShortNote, LongNote, HitPopup
-from utils import create_particles, countdown_timer
+from simulation import GameSimulation
+from song_clock import SongClock
+from charts import ChartNoteSource
+from chart_cache import load_chart
+from replay import Replay, open_replay_chart, replay_simulation, save_replay
+from objects import HitPopup, update_popups, clear_popups
+from utils import countdown_timer, display_format
+from particles import ParticleSystem
 from menu import main_menu, song_select_menu
-from rush_bar import draw_rush_bar
+from rush_bar import draw_rush_bar, prewarm_rush_bar
+from sprites import prewarm_note_sprites
+from fonts import draw_text, get_font, prewarm_text
+from dirty_rects import DirtyRenderer
+from profiler import FrameProfiler, TimedSource, NULL_PROFILER
+from latency import LatencyMonitor
+from frame_pacing import FrameScheduler
+from play_gc import PlayGC
+from calibration import load_input_offset
 from config import (
-    SCREEN_WIDTH, SCREEN_HEIGHT, FPS, NOTE_SPEED, SPAWN_INTERVAL, COMBO_FADE_TIME, HIT_WINDOW,
-    PERFECT_THRESHOLD, GOOD_THRESHOLD, main_keys, COLORS, lane_colors, NUM_LANES, HIT_ZONE_X, lane_positions,
-    RUSH_MAX, RUSH_GAIN_PER_HIT_NORMAL, RUSH_GAIN_PER_HIT_RUSH,
-    RUSH_DECAY_NORMAL, RUSH_DECAY_RUSH, RUSH_MULTIPLIER, UI
+    SCREEN_WIDTH, SCREEN_HEIGHT, GAMEPLAY_FPS, COMBO_FADE_TIME, main_keys, COLORS, RATING_COLORS,
+    lane_colors, HIT_ZONE_X, lane_positions, NOTE_SPEED, UI, PROFILER_ENABLED, PROFILE_LOG
 )
 
 pygame.init()
@@ -19,23 +32,37 @@ icon = pygame.image.load('assets/icon.png')
 pygame.display.set_icon(icon)
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 pygame.display.set_caption("Jazz Hero")
+prewarm_note_sprites(lane_colors)
+prewarm_rush_bar()
+prewarm_text([
+    *[(rating, color, "Segoe UI", 36, False) for rating, color in RATING_COLORS.items()],
+    ("RUSH", (255, 255, 255), "Segoe UI", 24, True),
+    ("RUSH", (0, 0, 0), "Segoe UI", 24, True),
+    ("RUSH MODE!", (255, 50, 50), "Segoe UI", 28, True),
+    ("RUSH MODE!", (0, 0, 0), "Segoe UI", 28, True),
+])
 
-# Lists for active notes, particles, and hit popups
-notes = []
-particles = []
-hit_popups = []
-score = 0
-combo = 0
-last_combo_time = 0
-spawn_time = 0
-chord_counter = 0
+# Lane for each key code; looked up by event.key, which unlike event.unicode
+# is set on key release and unaffected by modifiers and keyboard layout
+lane_keys = {pygame.key.key_code(key): lane for lane, key in enumerate(main_keys)}
+
+# Particle pool, hit popups and the simulation of the current session
+particles = ParticleSystem()
+hit_popups = deque()
+sim = None
 
 # --------------------------------------------------
 # Drawing Functions
 # --------------------------------------------------
 
-def draw_track(surface):
-    pygame.draw.rect(surface, COLORS['track'],
+_track_layer = None
+_track_layer_key = None
+
+def build_track_layer(size):
+    """Pre-render the background, track, lane lines and hit circles onto one surface."""
+    layer = pygame.Surface(size)
+    layer.fill(COLORS['background'])
+    pygame.draw.rect(layer, COLORS['track'],
                      (150, 50, SCREEN_WIDTH - 150, SCREEN_HEIGHT - 100))
     
     gray_color = (128, 128, 128)
@@ -45,275 +72,247 @@ def draw_track(surface):
 
     # Draw lane lines starting from the right edge of the hit zone circles
     for y in lane_positions:
-        pygame.draw.line(surface, gray_color, (right_line_x, int(y)), (SCREEN_WIDTH, int(y)), 3)
+        pygame.draw.line(layer, gray_color, (right_line_x, int(y)), (SCREEN_WIDTH, int(y)), 3)
 
     line_color = (255, 255, 0)
-    pygame.draw.line(surface, line_color, (left_line_x, 50), (left_line_x, SCREEN_HEIGHT - 50), 2)
-    pygame.draw.line(surface, line_color, (right_line_x, 50), (right_line_x, SCREEN_HEIGHT - 50), 2)
+    pygame.draw.line(layer, line_color, (left_line_x, 50), (left_line_x, SCREEN_HEIGHT - 50), 2)
+    pygame.draw.line(layer, line_color, (right_line_x, 50), (right_line_x, SCREEN_HEIGHT - 50), 2)
     
     for i, y in enumerate(lane_positions):
         circle_center = (HIT_ZONE_X, int(y))
-        pygame.draw.circle(surface, lane_colors[i], circle_center, circle_radius, 5)
+        pygame.draw.circle(layer, lane_colors[i], circle_center, circle_radius, 5)
+    return display_format(layer, alpha=False)
+
+def track_layer(surface):
+    """Return the cached track layer, rebuilding it if the layout or resolution changed."""
+    global _track_layer, _track_layer_key
+    key = (surface.get_size(), tuple(lane_positions), HIT_ZONE_X, tuple(lane_colors))
+    if key != _track_layer_key:
+        _track_layer = build_track_layer(surface.get_size())
+        _track_layer_key = key
+    return _track_layer
+
+# Pause menu buttons, and its overlay as a blit list for each hovered button
+PAUSE_PLAY_RECT = pygame.Rect(0, 0, *UI["button_size"])
+PAUSE_PLAY_RECT.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20)
+PAUSE_EXIT_RECT = pygame.Rect(0, 0, *UI["button_size"])
+PAUSE_EXIT_RECT.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 80)
+_pause_menus = {}
+
+def build_pause_menu(hovered):
+    """Dimming overlay, title and Play/Exit buttons, with button `hovered` (0, 1 or None) highlighted."""
+    # Draw a semi-transparent overlay
+    overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+    overlay.fill((0, 0, 0, 128))
+    blits = [(overlay, (0, 0))]
+    pause_text = get_font(UI["title_font"], 72).render("PAUSED", True, (255, 255, 255))
+    blits.append((pause_text, pause_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 200))))
+
+    for i, (rect, label) in enumerate(((PAUSE_PLAY_RECT, "Play"), (PAUSE_EXIT_RECT, "Exit"))):
+        button = pygame.Surface(rect.size, pygame.SRCALPHA)
+        btn_color = UI["secondary_color"] if i == hovered else UI["accent_color"]
+        pygame.draw.rect(button, btn_color, button.get_rect(), border_radius=UI["button_radius"])
+        blits.append((button, rect.topleft))
+        text = get_font(UI["body_font"], 36).render(label, True, (255, 255, 255))
+        blits.append((text, text.get_rect(center=rect.center)))
+    return blits
+
+def draw_pause_menu(surface):
+    mouse_pos = pygame.mouse.get_pos()
+    hovered = next((i for i, rect in enumerate((PAUSE_PLAY_RECT, PAUSE_EXIT_RECT)) if rect.collidepoint(mouse_pos)), None)
+    if hovered not in _pause_menus:
+        _pause_menus[hovered] = build_pause_menu(hovered)
+    surface.blits(_pause_menus[hovered], doreturn=False)
 
-def draw_ui(surface):
-    ui_font = pygame.font.SysFont("Segoe UI", 36)
-    score_text = ui_font.render(f"SCORE: {score}", True, COLORS['text'])
-    surface.blit(score_text, (20, 0))
+def draw_ui(surface, sim):
+    """Draw the score and combo; returns the rects drawn."""
+    rects = [draw_text(surface, f"SCORE: {sim.score}", COLORS['text'], topleft=(20, 0))]
     
-    if pygame.time.get_ticks() - last_combo_time < COMBO_FADE_TIME:
-        alpha = 255 * (1 - (pygame.time.get_ticks() - last_combo_time) / COMBO_FADE_TIME)
-        combo_text = pygame.font.SysFont("Segoe UI", 48).render(f"{combo}x COMBO!", True, (*COLORS['combo'], int(alpha)))
-        combo_pos = combo_text.get_rect(centerx=SCREEN_WIDTH // 2, y=50)
-        surface.blit(combo_text, combo_pos)
+    if sim.combo_visible():
+        alpha = 255 * (1 - (sim.time - sim.last_combo_time) / COMBO_FADE_TIME)
+        rects.append(draw_text(surface, f"{sim.combo}x COMBO!", COLORS['combo'], size=48, alpha=int(alpha), centerx=SCREEN_WIDTH // 2, y=50))
+    return rects
+
+def show_judgement(event):
+    """Spawn the particles and popup for a judgement coming out of the simulation."""
+    if event.kind == "miss":
+        return
+    y = lane_positions[event.lane]
+    particles.emit((HIT_ZONE_X, y), lane_colors[event.lane])
+    hit_popups.append(HitPopup.pool.acquire(event.rating, (HIT_ZONE_X, y - 30), RATING_COLORS[event.rating]))
+
+def update_effects(dt, profiler=NULL_PROFILER):
+    """Advance the particles and hit popups by one frame."""
+    particles.update()
+    profiler.lap("particle update")
+    update_popups(hit_popups, dt)
+    profiler.lap("popups")
+
+def draw_scene(surface, sim, alpha, profiler=NULL_PROFILER):
+    """Draw the moving parts of a gameplay frame over the track and return the rects drawn.
+
+    Notes are placed `alpha` steps past the last simulation step.
+    """
+    rects = []
+    # Interpolate note positions between the last two simulation steps
+    render_time = sim.time + alpha * sim.step_ms
+    offset_x = 0 if sim.clock_timing else NOTE_SPEED * alpha * sim.step_ms / 1000
+    for note in sim.note_field:
+        if sim.clock_timing:
+            note.sync(render_time)
+        rects.append(note.draw(surface, offset_x))
+    profiler.lap("note draw")
+    rects += particles.draw(surface)
+    profiler.lap("particle draw")
+    rects += draw_ui(surface, sim)
+    profiler.lap("ui")
+    rects += draw_rush_bar(surface, sim.rush_meter, sim.in_rush_mode)
+    profiler.lap("rush bar")
+    for popup in hit_popups:
+        rects.append(popup.draw(surface))
+    profiler.lap("popups")
+    return rects
 
 # --------------------------------------------------
 # Game Loop (Called after the Menu)
 # --------------------------------------------------
 
-def game():
-    global score, combo, last_combo_time, spawn_time, rush_meter, in_rush_mode, chord_counter
-    clock = pygame.time.Clock()
+def game(seed=None, chart=None, replay=None, autoplay=None):
+    """Play a session, or watch `replay` or the `autoplay` bot play instead of the keyboard."""
+    global sim
+    scheduler = FrameScheduler(GAMEPLAY_FPS)
     running = True
     paused = False  # Pause flag
 
     # Reset game variables
-    score = 0
-    combo = 0
-    spawn_time = pygame.time.get_ticks()
-    notes.clear()
+    input_offset = load_input_offset()
+    if replay is not None:
+        seed, chart = replay.seed, replay.chart
+        mapped_chart = open_replay_chart(replay)
+        sim = replay_simulation(replay, mapped_chart)
+    else:
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        mapped_chart = load_chart(chart) if chart else None
+        note_generator = ChartNoteSource(mapped_chart.entries()) if chart else None
+        sim = GameSimulation(note_generator, seed=seed, input_delay=max(round(input_offset), 0))
+    if autoplay is not None:
+        autoplay.attach(sim)
+    keyboard = replay is None and autoplay is None
+    latency = LatencyMonitor(frame_budget_ms=scheduler.budget_ms)
+    renderer = DirtyRenderer()
+    profiler = NULL_PROFILER
+
+    def toggle_profiler():
+        nonlocal profiler
+        if profiler is NULL_PROFILER:
+            profiler = FrameProfiler(log_path=PROFILE_LOG, frame_budget_ms=scheduler.budget_ms, latency=latency,
+                                     pacing=scheduler)
+            sim.note_generator = TimedSource(sim.note_generator, profiler)
+        else:
+            profiler.close()
+            profiler = NULL_PROFILER
+            sim.note_generator = sim.note_generator.source
+
+    if PROFILER_ENABLED:
+        toggle_profiler()
     particles.clear()
-    hit_popups.clear()
-    rush_meter = 0
-    in_rush_mode = False
-    chord_counter = 0
-    
-    note_generator = NoteLogic({
-        'SPAWN_INTERVAL': SPAWN_INTERVAL,
-        'NUM_LANES': NUM_LANES,
-        'NOTE_SPEED': NOTE_SPEED
-    })
+    particles.seed(seed)
+    clear_popups(hit_popups)
 
     countdown_timer(screen, COLORS['background'])
-    spawn_time = pygame.time.get_ticks()
-
-    while running:
-        dt = clock.tick(FPS) / 1000  # dt in seconds
-        current_time = pygame.time.get_ticks()
-
-        # Define the button rects for the pause menu
-        play_button_rect = pygame.Rect(0, 0, *UI["button_size"])
-        play_button_rect.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50)
-        exit_button_rect = pygame.Rect(0, 0, *UI["button_size"])
-        exit_button_rect.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50)
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    paused = not paused
-                elif not paused:
-                    if event.unicode in main_keys:
-                        lane = main_keys.index(event.unicode)
-                        note_hit = False
-                        # First, check for short notes in this lane
-                        for note in notes:
-                            if isinstance(note, ShortNote) and note.lane == lane and not note.hit and abs(note.pos.x - HIT_ZONE_X) < HIT_WINDOW:
-                                error = abs(note.pos.x - HIT_ZONE_X)
-                                if error <= PERFECT_THRESHOLD:
-                                    rating = "Perfect!"
-                                    grade_multiplier = 1.5
-                                    popup_color = (0, 255, 0)
-                                elif error <= GOOD_THRESHOLD:
-                                    rating = "Good!"
-                                    grade_multiplier = 1.0
-                                    popup_color = (255, 215, 0)
-                                else:
-                                    rating = "OK"
-                                    grade_multiplier = 0.5
-                                    popup_color = (255, 255, 255)
-
-                                note.hit = True
-                                particles.extend(create_particles((HIT_ZONE_X, note.pos.y), note.color))
-                                hit_popups.append(HitPopup(rating, (HIT_ZONE_X, note.pos.y - 30), popup_color))
-                                base_points = 100 + combo * 10
-                                points = int(base_points * grade_multiplier)
-                                if in_rush_mode:
-                                    points = int(points * RUSH_MULTIPLIER)
-                                    rush_meter = min(rush_meter + RUSH_GAIN_PER_HIT_RUSH, RUSH_MAX)
-                                else:
-                                    rush_meter = min(rush_meter + RUSH_GAIN_PER_HIT_NORMAL, RUSH_MAX)
-                                    if rush_meter >= RUSH_MAX:
-                                        rush_meter = RUSH_MAX
-                                        in_rush_mode = True
-                                score += points
-
-                                # Handle chord logic for short notes
-                                if note.chord_id is not None:
-                                    chord_notes = [n for n in notes if n.chord_id == note.chord_id]
-                                    if all(n.hit for n in chord_notes):
-                                        for n in chord_notes:
-                                            n.active = False
-                                        combo += 1
-                                        last_combo_time = current_time
-                                else:
-                                    note.active = False
-                                    combo += 1
-                                    last_combo_time = current_time
-                                note_hit = True
-                                break  # Process only one note per keypress
-                        # If no short note was hit, check for long notes in this lane
-                        if not note_hit:
-                            for note in notes:
-                                if isinstance(note, LongNote) and note.lane == lane and not note.held and not note.completed and abs(note.pos.x - HIT_ZONE_X) < HIT_WINDOW:
-                                    note.held = True
-                                    note.start_hold_time = pygame.time.get_ticks()
-                                    particles.extend(create_particles((HIT_ZONE_X, note.pos.y), note.color))
-                                    hit_popups.append(HitPopup("Hold!", (HIT_ZONE_X, note.pos.y - 30), (255, 255, 255)))
-                                    note_hit = True
-                                    break
-            elif event.type == pygame.KEYUP:
-                if event.unicode in main_keys:
-                    lane = main_keys.index(event.unicode)
-                    # Check if a long note is being held in this lane
-                    for note in notes:
-                        if isinstance(note, LongNote) and note.lane == lane and note.held and not note.completed:
-                            elapsed = pygame.time.get_ticks() - note.start_hold_time
-                            max_duration = note.length / NOTE_SPEED * 1000  # Convert to ms
-                            progress = min(elapsed / max_duration, 1.0)
-                            base_points = 200  # Base points for long notes
-                            points = int(base_points * progress)
-                            if in_rush_mode:
-                                points = int(points * RUSH_MULTIPLIER)
-                                rush_meter = min(rush_meter + RUSH_GAIN_PER_HIT_RUSH, RUSH_MAX)
-                            else:
-                                rush_meter = min(rush_meter + RUSH_GAIN_PER_HIT_NORMAL, RUSH_MAX)
-                                if rush_meter >= RUSH_MAX:
-                                    rush_meter = RUSH_MAX
-                                    in_rush_mode = True
-                            score += points
-                            if progress == 1.0:
-                                rating = "Perfect!"
-                                popup_color = (0, 255, 0)
-                            elif progress >= 0.8:
-                                rating = "Good!"
-                                popup_color = (255, 215, 0)
-                            else:
-                                rating = "OK"
-                                popup_color = (255, 255, 255)
-                            particles.extend(create_particles((HIT_ZONE_X, note.pos.y), note.color))
-                            hit_popups.append(HitPopup(rating, (HIT_ZONE_X, note.pos.y - 30), popup_color))
-                            combo += 1
-                            last_combo_time = pygame.time.get_ticks()
-                            note.held = False
-                            note.active = False
-                            break
-            elif paused and event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                if play_button_rect.collidepoint(event.pos):
-                    paused = False
-                elif exit_button_rect.collidepoint(event.pos):
+    song_clock = SongClock()
+    alpha = 0.0  # Fraction of a simulation step the render time is ahead of sim.time
+    play_gc = PlayGC()
+    play_gc.start()
+    scheduler.reset()
+
+    try:
+        while running:
+            # Paused, the loop only redraws at IDLE_FPS or when input arrives
+            frame_ms = scheduler.tick(idle=paused)
+            dt = frame_ms / 1000  # dt in seconds
+            profiler.begin_frame()
+
+            song_time = song_clock.now()
+            # Calibrated input time: where the player meant to hit
+            input_time = max(round(song_time - input_offset), 0)
+            read_at = latency.poll()
+
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                    pygame.quit()
+                    sys.exit()
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_F3:
+                        toggle_profiler()
+                        profiler.begin_frame()
+                    elif event.key == pygame.K_ESCAPE:
+                        paused = not paused
+                        if paused:
+                            song_clock.pause()
+                            play_gc.idle()
+                        else:
+                            song_clock.resume()
+                    elif not paused and keyboard and event.key in lane_keys:
+                        step = sim.queue_input(lane_keys[event.key], True, input_time)
+                        latency.input(lane_keys[event.key], input_time, step, read_at)
+                elif event.type == pygame.KEYUP:
+                    if keyboard and event.key in lane_keys:
+                        step = sim.queue_input(lane_keys[event.key], False, input_time)
+                        latency.input(lane_keys[event.key], input_time, step, read_at)
+                elif paused and event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                    if PAUSE_PLAY_RECT.collidepoint(event.pos):
+                        paused = False
+                        song_clock.resume()
+                    elif PAUSE_EXIT_RECT.collidepoint(event.pos):
+                        running = False
+
+            profiler.lap("events")
+
+            if not paused:
+                if replay is not None:
+                    song_time = min(song_time, replay.steps * sim.step_ms)
+                if autoplay is not None:
+                    autoplay.feed(song_time)
+                alpha = sim.advance(song_time)
+                if sim.song_over() or (replay is not None and sim.step_index >= replay.steps):
+                    running = False
+                if autoplay is not None and autoplay.time_up(sim):
                     running = False
+                for event in sim.drain_events():
+                    latency.judged(event)
+                    show_judgement(event)
+                latency.stepped(sim.step_index)
+                profiler.lap("note update")
+
+                update_effects(dt, profiler)
+
+            renderer.begin(screen, track_layer(screen))
+            profiler.lap("track")
+            renderer.mark_all(draw_scene(screen, sim, alpha, profiler))
+
+            if paused:
+                renderer.invalidate()  # The overlay dims the whole screen
+                draw_pause_menu(screen)
+                profiler.lap("ui")
+
+            renderer.mark(profiler.draw_overlay(screen))
+            profiler.lap("overlay")
+            renderer.present(screen)
+            profiler.lap("flip")
+            if not paused:  # Throttled frames would read as jitter and drops
+                latency.presented(frame_ms)
+                profiler.end_frame(frame_ms, len(sim.note_field), len(particles), len(hit_popups))
+    finally:
+        profiler.close()
+        play_gc.stop()
+        if chart:
+            mapped_chart.close()
 
-        if not paused:
-            new_notes = note_generator.generate_notes(current_time, notes)
-            notes.extend(new_notes)
-
-            # Rush mode decay logic
-            if in_rush_mode:
-                rush_meter -= RUSH_DECAY_RUSH * dt
-                if rush_meter <= 0:
-                    rush_meter = 0
-                    in_rush_mode = False
-            else:
-                rush_meter -= RUSH_DECAY_NORMAL * dt
-                rush_meter = max(rush_meter, 0)
-            # Update notes
-            notes[:] = [note for note in notes if note.active]
-            for note in notes:
-                note.update(dt)
-                if isinstance(note, ShortNote):
-                    if note.pos.x < HIT_ZONE_X - HIT_WINDOW and not note.hit:
-                        if note.chord_id is not None:
-                            chord_notes = [n for n in notes if n.chord_id == note.chord_id]
-                            for n in chord_notes:
-                                n.active = False
-                        combo = 0
-                elif isinstance(note, LongNote):
-                    if note.held and not note.completed:
-                        elapsed = pygame.time.get_ticks() - note.start_hold_time
-                        max_duration = note.length / NOTE_SPEED * 1000
-                        note.hold_progress = min(elapsed / max_duration, 1.0)
-                        if note.tail_x < HIT_ZONE_X - HIT_WINDOW:
-                            # Automatically complete long note if tail passes hit zone
-                            note.completed = True
-                            note.active = False
-                            base_points = 200
-                            points = base_points
-                            if in_rush_mode:
-                                points = int(points * RUSH_MULTIPLIER)
-                                rush_meter = min(rush_meter + RUSH_GAIN_PER_HIT_RUSH, RUSH_MAX)
-                            else:
-                                rush_meter = min(rush_meter + RUSH_GAIN_PER_HIT_NORMAL, RUSH_MAX)
-                                if rush_meter >= RUSH_MAX:
-                                    rush_meter = RUSH_MAX
-                                    in_rush_mode = True
-                            score += points
-                            particles.extend(create_particles((HIT_ZONE_X, note.pos.y), note.color))
-                            hit_popups.append(HitPopup("Perfect!", (HIT_ZONE_X, note.pos.y - 30), (0, 255, 0)))
-                            combo += 1
-                            last_combo_time = current_time
-
-            particles[:] = [p for p in particles if p.lifetime > 0]
-            for p in particles:
-                p.update()
-            hit_popups[:] = [popup for popup in hit_popups if popup.lifetime > 0]
-            for popup in hit_popups:
-                popup.update(dt)
-
-        screen.fill(COLORS['background'])
-        draw_track(screen)
-        for note in notes:
-            note.draw(screen)
-        for p in particles:
-            p.draw(screen)
-        draw_ui(screen)
-        draw_rush_bar(screen, rush_meter, in_rush_mode)
-        for popup in hit_popups:
-            popup.draw(screen)
-
-        if paused:
-            # Draw a semi-transparent overlay
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            overlay.fill((0, 0, 0, 128))
-            screen.blit(overlay, (0, 0))
-            pause_text = pygame.font.Font(UI["title_font"], 72).render("PAUSED", True, (255, 255, 255))
-            text_rect = pause_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 200))
-            screen.blit(pause_text, text_rect)
-
-            # Define the button rects for the pause menu
-            play_button_rect = pygame.Rect(0, 0, *UI["button_size"])
-            play_button_rect.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20)  # Adjusted position
-            exit_button_rect = pygame.Rect(0, 0, *UI["button_size"])
-            exit_button_rect.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 80)  # Adjusted position
-
-            # Draw the Play button
-            mouse_pos = pygame.mouse.get_pos()
-            play_btn_color = UI["secondary_color"] if play_button_rect.collidepoint(mouse_pos) else UI["accent_color"]
-            pygame.draw.rect(screen, play_btn_color, play_button_rect, border_radius=UI["button_radius"])
-            play_text = pygame.font.Font(UI["body_font"], 36).render("Play", True, (255, 255, 255))
-            play_text_rect = play_text.get_rect(center=play_button_rect.center)
-            screen.blit(play_text, play_text_rect)
-
-            # Draw the Exit button
-            exit_btn_color = UI["secondary_color"] if exit_button_rect.collidepoint(mouse_pos) else UI["accent_color"]
-            pygame.draw.rect(screen, exit_btn_color, exit_button_rect, border_radius=UI["button_radius"])
-            exit_text = pygame.font.Font(UI["body_font"], 36).render("Exit", True, (255, 255, 255))
-            exit_text_rect = exit_text.get_rect(center=exit_button_rect.center)
-            screen.blit(exit_text, exit_text_rect)
-
-        pygame.display.flip()
+    if keyboard:
+        save_replay(Replay.from_simulation(sim, chart))
 
 # --------------------------------------------------
 # Main Entry Point
@@ -326,6 +325,8 @@ def main():
             mode = song_select_menu(screen)
             if mode == "infinite":
                 game()
+            elif mode != "back":
+                game(chart=mode)
         elif action == "exit":
             pygame.quit()
             sys.exit()
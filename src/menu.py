@@ -1,42 +1,101 @@
 import pygame
 import sys
-import random
-from pygame.math import Vector2
-from config import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, UI, MENU_BACKGROUND
+import numpy as np
+from config import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, UI, MENU_BACKGROUND, MENU_IDLE_AFTER_MS
 from utils import draw_gradient_background
+from fonts import get_font
+from charts import list_charts, chart_title
+from calibration import calibration_screen
+from dirty_rects import DirtyRenderer
+from menu_effects import StarField, MenuParticles
+from frame_pacing import FrameScheduler
+
+# --------------------------
+# Scene Cache
+# --------------------------
+#
+# Menu backgrounds and the layers over them are built on first use, once per
+# hover state, and kept for the session; the menu loops only blit them and
+# animate the stars and particles in between.
+
+_scenes = {}
+
+def _scene(key, build, *args):
+    scene = _scenes.get(key)
+    if scene is None:
+        scene = _scenes[key] = build(*args)
+    return scene
+
+def clear_scene_cache():
+    _scenes.clear()
+
+def _gradient_background():
+    bg_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    draw_gradient_background(bg_surface, MENU_BACKGROUND[0], MENU_BACKGROUND[1])
+    return bg_surface
+
+def _flat_background():
+    background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    background.fill(MENU_BACKGROUND[1])
+    return background
+
+def _gradient_text(font, text, left_color, right_color):
+    """White text recolored column by column from left_color to right_color."""
+    surface = font.render(text, True, (255, 255, 255)).convert_alpha()
+    ratio = np.arange(surface.get_width())[:, None] / surface.get_width()
+    colors = np.array(left_color[:3]) * (1 - ratio) + np.array(right_color[:3]) * ratio
+    pygame.surfarray.pixels3d(surface)[:] = colors.astype(np.uint8)[:, None, :]
+    return surface
+
+def _new_layer():
+    """Transparent full-screen layer for what sits over the animated background.
+
+    Layers hold premultiplied alpha, which is how DirtyRenderer blends them
+    over the screen: add translucent surfaces with _compose and draw shapes
+    only in opaque colors.
+    """
+    return pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+
+def _compose(layer, surface, dest):
+    # premul_alpha() ignores row padding, which rendered text has; convert_alpha() packs the rows
+    layer.blit(surface.convert_alpha().premul_alpha(), dest, special_flags=pygame.BLEND_PREMULTIPLIED)
+
+def _charting_scene(back_button_rect, hovered):
+    """The whole charting menu, which only changes with the hover state of its button."""
+    scene = _scene("gradient background", _gradient_background).copy()
+    font = get_font(UI["body_font"], 36)
+
+    # Draw glass panel
+    glass_rect = pygame.Rect(
+        SCREEN_WIDTH//2 - 300, 100, 600, SCREEN_HEIGHT - 200
+    )
+    glass_surface = pygame.Surface(glass_rect.size, pygame.SRCALPHA)
+    pygame.draw.rect(glass_surface, UI["glass_color"], glass_surface.get_rect(), border_radius=20)
+    scene.blit(glass_surface, glass_rect.topleft)
+
+    # Draw grid lines
+    for y in range(glass_rect.top + 50, glass_rect.bottom, 50):
+        pygame.draw.line(scene, (255, 255, 255, 30), (glass_rect.left + 20, y), (glass_rect.right - 20, y))
+
+    # Draw back button
+    btn_color = UI["secondary_color"] if hovered else UI["accent_color"]
+    pygame.draw.rect(scene, btn_color, back_button_rect, border_radius=UI["button_radius"])
+    text = font.render("BACK", True, (255, 255, 255))
+    text_rect = text.get_rect(center=back_button_rect.center)
+    scene.blit(text, text_rect)
+    return scene
 
 def charting_menu(screen):
     """Modern charting menu with glassmorphism effect"""
     charting_running = True
-    clock = pygame.time.Clock()
-    font = pygame.font.Font(UI["body_font"], 36)
+    scheduler = FrameScheduler(FPS)
+    renderer = DirtyRenderer()
     back_button_rect = pygame.Rect(50, SCREEN_HEIGHT - 100, 200, 60)
 
-    bg_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-    draw_gradient_background(bg_surface, MENU_BACKGROUND[0], MENU_BACKGROUND[1])
-
     while charting_running:
         mouse_pos = pygame.mouse.get_pos()
-        screen.blit(bg_surface, (0, 0))
-
-        # Draw glass panel
-        glass_rect = pygame.Rect(
-            SCREEN_WIDTH//2 - 300, 100, 600, SCREEN_HEIGHT - 200
-        )
-        glass_surface = pygame.Surface(glass_rect.size, pygame.SRCALPHA)
-        pygame.draw.rect(glass_surface, UI["glass_color"], glass_surface.get_rect(), border_radius=20)
-        screen.blit(glass_surface, glass_rect.topleft)
-
-        # Draw grid lines
-        for y in range(glass_rect.top + 50, glass_rect.bottom, 50):
-            pygame.draw.line(screen, (255, 255, 255, 30), (glass_rect.left + 20, y), (glass_rect.right - 20, y))
-
-        # Draw back button
-        btn_color = UI["secondary_color"] if back_button_rect.collidepoint(mouse_pos) else UI["accent_color"]
-        pygame.draw.rect(screen, btn_color, back_button_rect, border_radius=UI["button_radius"])
-        text = font.render("BACK", True, (255, 255, 255))
-        text_rect = text.get_rect(center=back_button_rect.center)
-        screen.blit(text, text_rect)
+        hovered = back_button_rect.collidepoint(mouse_pos)
+        renderer.begin(screen, _scene(("charting", hovered), _charting_scene, back_button_rect, hovered))
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -46,102 +105,95 @@ def charting_menu(screen):
                 if back_button_rect.collidepoint(mouse_pos):
                     charting_running = False
 
-        pygame.display.flip()
-        clock.tick(FPS)
+        renderer.present(screen)
+        scheduler.tick(idle=True)  # Nothing animates; only input changes the scene
+        
+def _song_select_foreground(buttons, hovered):
+    layer = _new_layer()
+    title_font = get_font(UI["title_font"], 72)
+    button_font = get_font(UI["body_font"], 36)
+
+    # Draw glass panel
+    glass_rect = pygame.Rect(SCREEN_WIDTH//2 - 300, 100, 600, SCREEN_HEIGHT - 200)
+    glass_surface = pygame.Surface(glass_rect.size, pygame.SRCALPHA)
+    pygame.draw.rect(glass_surface, UI["glass_color"], glass_surface.get_rect(), border_radius=20)
+    _compose(layer, glass_surface, glass_rect.topleft)
+
+    # Draw title
+    title_text = title_font.render("Select Mode", True, (255, 255, 255))
+    title_rect = title_text.get_rect(center=(SCREEN_WIDTH//2, 150))
+    _compose(layer, title_text, title_rect)
+
+    # Draw buttons
+    for i, btn in enumerate(buttons):
+        color = UI["secondary_color"] if i == hovered else UI["accent_color"]
+        
+        # Button shadow
+        shadow_surface = pygame.Surface(btn["rect"].size, pygame.SRCALPHA)
+        pygame.draw.rect(shadow_surface, (0, 0, 0, 50 if i == hovered else 30), 
+                       shadow_surface.get_rect(), border_radius=UI["button_radius"])
+        _compose(layer, shadow_surface, (btn["rect"].x - 4, btn["rect"].y + 4))
         
+        # Button body
+        pygame.draw.rect(layer, color, btn["rect"], border_radius=UI["button_radius"])
+        
+        # Button text
+        text_surf = button_font.render(btn["text"], True, (255, 255, 255))
+        text_rect = text_surf.get_rect(center=btn["rect"].center)
+        _compose(layer, text_surf, text_rect)
+    return layer
+
 def song_select_menu(screen):
-    """Styled mode selection menu with animated background"""
+    """Styled mode selection menu with animated background.
+
+    Returns "infinite", "back", or the path of the chart to play.
+    """
     menu_running = True
-    clock = pygame.time.Clock()
-    title_font = pygame.font.Font(UI["title_font"], 72)
-    button_font = pygame.font.Font(UI["body_font"], 36)
-    
-    # Pre-render gradient background
-    bg_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-    draw_gradient_background(bg_surface, MENU_BACKGROUND[0], MENU_BACKGROUND[1])
+    scheduler = FrameScheduler(FPS, idle_after_ms=MENU_IDLE_AFTER_MS)
+    bg_surface = _scene("gradient background", _gradient_background)
 
     # Animated elements
-    parallax_layers = [
-        {"speed": 0.2, "stars": [Vector2(random.randint(0, SCREEN_WIDTH), random.randint(0, SCREEN_HEIGHT)) for _ in range(50)]},
-        {"speed": 0.5, "stars": [Vector2(random.randint(0, SCREEN_WIDTH), random.randint(0, SCREEN_HEIGHT)) for _ in range(100)]}
-    ]
-    particles = []
-    particle_timer = 0
-
-    # Button definitions
-    buttons = [
-        {"rect": pygame.Rect(0, 0, *UI["button_size"]), "text": "Infinite Mode", "action": "infinite"},
-        {"rect": pygame.Rect(0, 0, *UI["button_size"]), "text": "Back", "action": "back"}
-    ]
+    stars = StarField()
+    particles = MenuParticles()
+
+    # Button definitions, with one button per chart that fits on the panel
+    buttons = [{"rect": pygame.Rect(0, 0, *UI["button_size"]), "text": "Infinite Mode", "action": "infinite"}]
+    for path in list_charts()[:2]:
+        buttons.append({"rect": pygame.Rect(0, 0, *UI["button_size"]), "text": chart_title(path), "action": path})
+    buttons.append({"rect": pygame.Rect(0, 0, *UI["button_size"]), "text": "Back", "action": "back"})
+    spacing = 140 if len(buttons) <= 2 else 100
     for i, btn in enumerate(buttons):
-        btn["rect"].center = (SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 60 + i * 140)
+        btn["rect"].center = (SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 60 - (len(buttons) - 2) * spacing // 2 + i * spacing)
 
     # Play background music if not already playing
     if not pygame.mixer.music.get_busy():
         pygame.mixer.music.load('assets/audio/menu_music.mp3')
         pygame.mixer.music.play(-1)  # Loop indefinitely
 
+    renderer = DirtyRenderer()
+    # Panel, title and buttons for each hovered button; the chart buttons vary with the charts on disk
+    layout = tuple(btn["text"] for btn in buttons)
+
     while menu_running:
-        dt = clock.tick(FPS) * 0.001
+        dt = scheduler.tick() * 0.001
         mouse_pos = pygame.mouse.get_pos()
+        hovered = next((i for i, btn in enumerate(buttons) if btn["rect"].collidepoint(mouse_pos)), None)
+        foreground = _scene(("song select", layout, hovered), _song_select_foreground, buttons, hovered)
         
         # Animate background
-        screen.blit(bg_surface, (0, 0))
+        canvas = renderer.begin(screen, bg_surface, foreground)
         
         # Draw parallax stars
-        for layer in parallax_layers:
-            for star in layer["stars"]:
-                star.x = (star.x + layer["speed"] * dt * 60) % SCREEN_WIDTH
-                size = 2 if layer["speed"] == 0.2 else 1
-                pygame.draw.circle(screen, (255, 255, 255, 50), star, size)
+        stars.update(dt)
+        renderer.mark_all(stars.draw(canvas))
 
         # Update particles
-        particle_timer += dt
-        if particle_timer > 0.1:
-            particle_timer = 0
-            particles.append({
-                "pos": Vector2(random.randint(0, SCREEN_WIDTH), SCREEN_HEIGHT + 20),
-                "vel": Vector2(random.uniform(-0.5, 0.5), random.uniform(-3, -2)),
-                "size": random.randint(8, 12),
-                "color": random.choice(UI["particle_colors"])
-            })
-        particles = [p for p in particles if p["pos"].y > -20]
-        for p in particles:
-            p["pos"] += p["vel"] * dt * 60
-            pygame.draw.circle(screen, p["color"], p["pos"], p["size"])
-
-        # Draw glass panel
-        glass_rect = pygame.Rect(SCREEN_WIDTH//2 - 300, 100, 600, SCREEN_HEIGHT - 200)
-        glass_surface = pygame.Surface(glass_rect.size, pygame.SRCALPHA)
-        pygame.draw.rect(glass_surface, UI["glass_color"], glass_surface.get_rect(), border_radius=20)
-        screen.blit(glass_surface, glass_rect.topleft)
-
-        # Draw title
-        title_text = title_font.render("Select Mode", True, (255, 255, 255))
-        title_rect = title_text.get_rect(center=(SCREEN_WIDTH//2, 150))
-        screen.blit(title_text, title_rect)
-
-        # Draw buttons
-        for btn in buttons:
-            hovered = btn["rect"].collidepoint(mouse_pos)
-            color = UI["secondary_color"] if hovered else UI["accent_color"]
-            
-            # Button shadow
-            shadow_surface = pygame.Surface(btn["rect"].size, pygame.SRCALPHA)
-            pygame.draw.rect(shadow_surface, (0, 0, 0, 50 if hovered else 30), 
-                           shadow_surface.get_rect(), border_radius=UI["button_radius"])
-            screen.blit(shadow_surface, (btn["rect"].x - 4, btn["rect"].y + 4))
-            
-            # Button body
-            pygame.draw.rect(screen, color, btn["rect"], border_radius=UI["button_radius"])
-            
-            # Button text
-            text_surf = button_font.render(btn["text"], True, (255, 255, 255))
-            text_rect = text_surf.get_rect(center=btn["rect"].center)
-            screen.blit(text_surf, text_rect)
+        particles.update(dt)
+        renderer.mark_all(particles.draw(canvas))
 
         # Event handling
         for event in pygame.event.get():
+            scheduler.mark_active()
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -153,121 +205,114 @@ def song_select_menu(screen):
                             return "infinite"
                         elif btn["action"] == "back":
                             return "back"
+                        else:
+                            pygame.mixer.music.stop()
+                            return btn["action"]
 
-        pygame.display.flip()
+        renderer.present(screen)
 
     return "back"
 
+def _main_menu_button(idx, button_y):
+    btn_rect = pygame.Rect(0, 0, *UI["button_size"])
+    btn_rect.center = (SCREEN_WIDTH//2, button_y + idx * 120)
+    return btn_rect
+
+def _main_menu_title():
+    """Title, shadow and credits, shared by every hover state of the main menu."""
+    layer = _new_layer()
+    title_font = get_font(UI["title_font"], 120)
+
+    # Draw title with gradient
+    title_surface = _gradient_text(title_font, "JAZZ HERO", UI["accent_color"], UI["secondary_color"])
+    title_rect = title_surface.get_rect(center=(SCREEN_WIDTH//2, 150))
+    
+    # Add shadow
+    shadow = title_font.render("JAZZ HERO", True, UI["text_shadow"])
+    _compose(layer, shadow, title_rect.move(5, 5))
+    _compose(layer, title_surface, title_rect)
+
+    # Draw credits
+    credits = get_font(UI["body_font"], 24).render("Built by Gio & Miles", True, (200, 200, 200, 150))
+    _compose(layer, credits, (20, SCREEN_HEIGHT - 40))
+    return layer
+
+def _main_menu_foreground(menu_options, button_y, hovered):
+    layer = _scene("main menu title", _main_menu_title).copy()
+    button_font = get_font(UI["body_font"], 40)
+
+    # Draw menu buttons
+    for idx, option in enumerate(menu_options):
+        btn_rect = _main_menu_button(idx, button_y)
+        
+        # Hover animation
+        hover = idx == hovered
+        scale = 1.1 if hover else 1
+        scaled_rect = btn_rect.inflate(btn_rect.width * (scale-1), btn_rect.height * (scale-1))
+        scaled_rect.center = btn_rect.center
+        
+        # Draw button
+        btn_color = UI["secondary_color"] if hover else UI["accent_color"]
+        pygame.draw.rect(layer, btn_color, scaled_rect, border_radius=UI["button_radius"])
+        
+        # Add text
+        text = button_font.render(option["text"], True, (255, 255, 255))
+        text_rect = text.get_rect(center=scaled_rect.center)
+        _compose(layer, text, text_rect)
+    return layer
+
 def main_menu(screen):
     """Modern main menu with parallax and animated elements"""
     menu_running = True
-    clock = pygame.time.Clock()
-    title_font = pygame.font.Font(UI["title_font"], 120)
-    button_font = pygame.font.Font(UI["body_font"], 40)
+    scheduler = FrameScheduler(FPS, idle_after_ms=MENU_IDLE_AFTER_MS)
     
     menu_options = [
         {"text": "Play", "action": "play"},
         {"text": "Charting", "action": "charting"},
+        {"text": "Calibrate", "action": "calibrate"},
         {"text": "Exit", "action": "exit"}
     ]
 
     # Parallax layers
-    parallax_layers = [
-        {"speed": 0.2, "stars": [Vector2(random.randint(0, SCREEN_WIDTH), random.randint(0, SCREEN_HEIGHT)) for _ in range(50)]},
-        {"speed": 0.5, "stars": [Vector2(random.randint(0, SCREEN_WIDTH), random.randint(0, SCREEN_HEIGHT)) for _ in range(100)]}
-    ]
+    stars = StarField()
 
     # Animated background particles
-    particles = []
-    particle_timer = 0
+    particles = MenuParticles()
 
     # Play background music if not already playing
     if not pygame.mixer.music.get_busy():
         pygame.mixer.music.load('assets/audio/menu_music.mp3')
         pygame.mixer.music.play(-1)  # Loop indefinitely
 
+    background = _scene("flat background", _flat_background)
+    renderer = DirtyRenderer()
+    button_y = SCREEN_HEIGHT//2 - 100
+
     while menu_running:
-        dt = clock.tick(FPS) * 0.001
+        dt = scheduler.tick() * 0.001
         mouse_pos = pygame.mouse.get_pos()
-        screen.fill(MENU_BACKGROUND[1])
+        hovered = next((idx for idx in range(len(menu_options))
+                        if _main_menu_button(idx, button_y).collidepoint(mouse_pos)), None)
+        foreground = _scene(("main menu", hovered), _main_menu_foreground, menu_options, button_y, hovered)
+        canvas = renderer.begin(screen, background, foreground)
 
         # Draw parallax stars
-        for layer in parallax_layers:
-            for star in layer["stars"]:
-                star.x = (star.x + layer["speed"] * dt * 60) % SCREEN_WIDTH
-                size = 2 if layer["speed"] == 0.2 else 1
-                pygame.draw.circle(screen, (255, 255, 255, 50), star, size)
-
-        # Generate new particles
-        particle_timer += dt
-        if particle_timer > 0.1:
-            particle_timer = 0
-            particles.append({
-                "pos": Vector2(random.randint(0, SCREEN_WIDTH), SCREEN_HEIGHT + 20),
-                "vel": Vector2(random.uniform(-0.5, 0.5), random.uniform(-3, -2)),
-                "size": random.randint(8, 12),
-                "color": random.choice(UI["particle_colors"])
-            })
-
-        # Update and draw particles
-        particles = [p for p in particles if p["pos"].y > -20]
-        for p in particles:
-            p["pos"] += p["vel"] * dt * 60
-            pygame.draw.circle(screen, p["color"], p["pos"], p["size"])
-
-        # Draw title with gradient
-        title_surface = title_font.render("JAZZ HERO", True, (255, 255, 255))
-        title_rect = title_surface.get_rect(center=(SCREEN_WIDTH//2, 150))
-        
-        # Create gradient overlay
-        gradient = pygame.Surface(title_surface.get_size(), pygame.SRCALPHA)
-        for x in range(title_surface.get_width()):
-            ratio = x / title_surface.get_width()
-            color = (
-                int(UI["accent_color"][0] * (1 - ratio) + UI["secondary_color"][0] * ratio),
-                int(UI["accent_color"][1] * (1 - ratio) + UI["secondary_color"][1] * ratio),
-                int(UI["accent_color"][2] * (1 - ratio) + UI["secondary_color"][2] * ratio),
-                255
-            )
-            pygame.draw.line(gradient, color, (x, 0), (x, title_surface.get_height()))
-        title_surface.blit(gradient, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-        
-        # Add shadow
-        shadow = title_font.render("JAZZ HERO", True, UI["text_shadow"])
-        screen.blit(shadow, title_rect.move(5, 5))
-        screen.blit(title_surface, title_rect)
-
-        # Draw menu buttons
-        button_y = SCREEN_HEIGHT//2 - 100
-        for idx, option in enumerate(menu_options):
-            btn_rect = pygame.Rect(0, 0, *UI["button_size"])
-            btn_rect.center = (SCREEN_WIDTH//2, button_y + idx * 120)
-            
-            # Hover animation
-            hover = btn_rect.collidepoint(mouse_pos)
-            scale = 1.1 if hover else 1
-            scaled_rect = btn_rect.inflate(btn_rect.width * (scale-1), btn_rect.height * (scale-1))
-            scaled_rect.center = btn_rect.center
-            
-            # Draw button
-            btn_color = UI["secondary_color"] if hover else UI["accent_color"]
-            pygame.draw.rect(screen, btn_color, scaled_rect, border_radius=UI["button_radius"])
-            
-            # Add text
-            text = button_font.render(option["text"], True, (255, 255, 255))
-            text_rect = text.get_rect(center=scaled_rect.center)
-            screen.blit(text, text_rect)
+        stars.update(dt)
+        renderer.mark_all(stars.draw(canvas))
+
+        # Generate, update and draw particles
+        particles.update(dt)
+        renderer.mark_all(particles.draw(canvas))
 
         # Event handling
         for event in pygame.event.get():
+            scheduler.mark_active()
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.MOUSEBUTTONDOWN:
                 for idx, option in enumerate(menu_options):
-                    btn_rect = pygame.Rect(0, 0, *UI["button_size"])
-                    btn_rect.center = (SCREEN_WIDTH//2, button_y + idx * 120)
-                    if btn_rect.collidepoint(mouse_pos):
+                    if _main_menu_button(idx, button_y).collidepoint(mouse_pos):
                         if option["action"] == "play":
                             menu_running = False
                             return "play"
@@ -276,16 +321,18 @@ def main_menu(screen):
                             charting_menu(screen)
                             pygame.mixer.music.load('assets/audio/menu_music.mp3')  # Restart music when returning from charting menu
                             pygame.mixer.music.play(-1)
+                            renderer.invalidate()  # The charting menu drew over the whole screen
+                        elif option["action"] == "calibrate":
+                            pygame.mixer.music.stop()  # The metronome needs silence
+                            calibration_screen(screen)
+                            pygame.mixer.music.load('assets/audio/menu_music.mp3')
+                            pygame.mixer.music.play(-1)
+                            renderer.invalidate()
                         elif option["action"] == "exit":
                             pygame.quit()
                             sys.exit()
 
-        # Draw credits
-        credit_font = pygame.font.Font(UI["body_font"], 24)
-        credits = credit_font.render("Built by Gio & Miles", True, (200, 200, 200, 150))
-        screen.blit(credits, (20, SCREEN_HEIGHT - 40))
-
-        pygame.display.flip()
+        renderer.present(screen)
     
     pygame.mixer.music.stop()  # Stop music when leaving the menu
     return "exit"
\ No newline at end of file
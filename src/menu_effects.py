@@ -0,0 +1,108 @@
+import numpy as np
+import pygame
+from utils import display_format
+from config import SCREEN_WIDTH, SCREEN_HEIGHT, UI
+
+# --------------------------
+# Menu Background Effects
+# --------------------------
+#
+# The parallax stars and rising particles behind the menus. Positions live in
+# NumPy arrays and are moved with one vector operation per frame; dots are
+# blitted from pre-rendered sprites with one Surface.blits call.
+
+STAR_LAYERS = ((0.2, 50, 2), (0.5, 100, 1))  # (speed, count, radius) per parallax layer
+MENU_PARTICLE_INTERVAL = 0.1                 # Seconds between particle spawns
+MENU_PARTICLE_CAPACITY = 128                 # Well above the ~70 alive at once
+DOT_COLORKEY = (0, 0, 0)                     # Not used by any star or particle color
+
+_dot_sprites = {}
+
+def dot_sprite(color, radius):
+    """A filled circle the same as pygame.draw.circle at radius, blitted at center - radius.
+
+    The dots are opaque, so the corners are cut out with a color key rather
+    than per-pixel alpha, which blits about twice as fast.
+    """
+    key = (tuple(color[:3]), radius)
+    sprite = _dot_sprites.get(key)
+    if sprite is None:
+        sprite = pygame.Surface((radius * 2, radius * 2))
+        sprite.fill(DOT_COLORKEY)
+        pygame.draw.circle(sprite, color[:3], (radius, radius), radius)
+        sprite.set_colorkey(DOT_COLORKEY, pygame.RLEACCEL)
+        sprite = _dot_sprites[key] = display_format(sprite, alpha=False)
+    return sprite
+
+def _blit_dots(surface, sprites, pos, radii):
+    """Blit one sprite per row of pos; returns the rects drawn."""
+    corners = (pos - radii[:, None]).astype(np.int32).tolist()
+    return surface.blits(list(zip(sprites, corners)))
+
+class StarField:
+    """Parallax stars drifting right and wrapping around the screen."""
+
+    def __init__(self, rng=None, layers=STAR_LAYERS):
+        rng = rng if rng is not None else np.random.default_rng()
+        count = sum(layer[1] for layer in layers)
+        self.pos = np.column_stack((rng.integers(0, SCREEN_WIDTH + 1, count),
+                                    rng.integers(0, SCREEN_HEIGHT + 1, count))).astype(np.float32)
+        self.speed = np.repeat([layer[0] for layer in layers], [layer[1] for layer in layers]).astype(np.float32)
+        self.radius = np.repeat([layer[2] for layer in layers], [layer[1] for layer in layers]).astype(np.int32)
+        self.sprites = [dot_sprite((255, 255, 255), radius) for radius in self.radius.tolist()]
+
+    def update(self, dt):
+        self.pos[:, 0] += self.speed * (dt * 60)
+        np.mod(self.pos[:, 0], SCREEN_WIDTH, out=self.pos[:, 0])
+
+    def draw(self, surface):
+        return _blit_dots(surface, self.sprites, self.pos, self.radius)
+
+class MenuParticles:
+    """Colored dots rising from below the screen, one spawned every MENU_PARTICLE_INTERVAL."""
+
+    def __init__(self, rng=None, capacity=MENU_PARTICLE_CAPACITY, colors=UI["particle_colors"]):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.capacity = capacity
+        self.colors = colors
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.velocity = np.zeros((capacity, 2), dtype=np.float32)
+        self.radius = np.zeros(capacity, dtype=np.int32)
+        self.sprites = [None] * capacity
+        self.count = 0
+        self.timer = 0.0
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self):
+        if self.count == self.capacity:
+            return
+        i, rng = self.count, self.rng
+        self.pos[i] = (rng.integers(0, SCREEN_WIDTH + 1), SCREEN_HEIGHT + 20)
+        self.velocity[i] = (rng.uniform(-0.5, 0.5), rng.uniform(-3, -2))
+        self.radius[i] = rng.integers(8, 13)
+        self.sprites[i] = dot_sprite(self.colors[rng.integers(len(self.colors))], int(self.radius[i]))
+        self.count += 1
+
+    def update(self, dt):
+        """Spawn on the timer, move everything and drop particles that left the top of the screen."""
+        self.timer += dt
+        if self.timer > MENU_PARTICLE_INTERVAL:
+            self.timer = 0
+            self.spawn()
+
+        n = self.count
+        alive = np.flatnonzero(self.pos[:n, 1] > -20)
+        if len(alive) < n:
+            k = len(alive)
+            self.pos[:k] = self.pos[alive]
+            self.velocity[:k] = self.velocity[alive]
+            self.radius[:k] = self.radius[alive]
+            self.sprites[:k] = [self.sprites[i] for i in alive.tolist()]
+            self.count = n = k
+        self.pos[:n] += self.velocity[:n] * (dt * 60)
+
+    def draw(self, surface):
+        n = self.count
+        return _blit_dots(surface, self.sprites[:n], self.pos[:n], self.radius[:n])
@@ -0,0 +1,190 @@
+from collections import deque
+from objects import LongNote
+
+class ChordRegistry:
+    """Chords keyed by monotonically increasing IDs, with their member notes and hit count."""
+
+    def __init__(self):
+        self.next_id = 1
+        self.members = {}
+        self.hits = {}
+
+    def __len__(self):
+        return len(self.members)
+
+    def clear(self):
+        self.members.clear()
+        self.hits.clear()
+
+    def create(self, notes):
+        """Group notes into a new chord and return its ID."""
+        chord_id = self.next_id
+        self.next_id += 1
+        for note in notes:
+            note.chord_id = chord_id
+        self.members[chord_id] = list(notes)
+        self.hits[chord_id] = 0
+        return chord_id
+
+    def register_hit(self, chord_id):
+        """Count a hit on a chord member; returns True once every member has been hit."""
+        self.hits[chord_id] += 1
+        return self.hits[chord_id] >= len(self.members[chord_id])
+
+    def release(self, chord_id):
+        """Forget a completed or missed chord and return its members."""
+        self.hits.pop(chord_id, None)
+        return self.members.pop(chord_id, ())
+
+class NoteField:
+    """Active notes plus a time-ordered queue of judgeable notes per lane.
+
+    The head of each lane queue is the next note that can be judged in that
+    lane. Notes leave their queue once hit, held or missed, so hit lookup and
+    miss expiry only ever look at queue heads.
+
+    Notes leaving the draw list wait in `retired` until their despawn time
+    and then go back to their class pool, under frame timing as well as clock
+    timing. By then misses have expired them from their lane queue, and
+    recycle() drops the last references held here (the lane's long-note
+    queue and the chord).
+    """
+
+    def __init__(self, num_lanes):
+        self.num_lanes = num_lanes
+        self.notes = deque()
+        self.retired = deque()
+        self.lanes = [deque() for _ in range(num_lanes)]
+        self.long_notes = [deque() for _ in range(num_lanes)]  # Long notes per lane in spawn order
+        self.long_mask = 0  # Bit per lane that may hold an active long note
+        self.chords = ChordRegistry()
+
+    def __iter__(self):
+        return iter(self.notes)
+
+    def __len__(self):
+        return len(self.notes)
+
+    def clear(self):
+        self.notes.clear()
+        self.retired.clear()
+        for queue in self.lanes:
+            queue.clear()
+        for queue in self.long_notes:
+            queue.clear()
+        self.long_mask = 0
+        self.chords.clear()
+
+    def add(self, note):
+        self.notes.append(note)
+        self.lanes[note.lane].append(note)
+        if isinstance(note, LongNote):
+            self.long_notes[note.lane].append(note)
+            self.long_mask |= 1 << note.lane
+
+    def extend(self, notes):
+        for note in notes:
+            self.add(note)
+
+    def head(self, lane):
+        """Return the next judgeable note in a lane, skipping notes deactivated elsewhere."""
+        queue = self.lanes[lane]
+        while queue and not queue[0].active:
+            queue.popleft()
+        return queue[0] if queue else None
+
+    def pop_head(self, lane):
+        return self.lanes[lane].popleft()
+
+    def long_notes_in(self, lane):
+        """Return the active long notes of a lane in spawn order, dropping ones that have left the screen.
+
+        Charts can overlap long notes in one lane, so a lane may hold several.
+        """
+        queue = self.long_notes[lane]
+        if any(not note.active for note in queue):
+            live = [note for note in queue if note.active]
+            queue.clear()
+            queue.extend(live)
+        if not queue:
+            self.long_mask &= ~(1 << lane)
+        return queue
+
+    def held_long(self, lane):
+        """Return the earliest long note being held in a lane, or None."""
+        for note in self.long_notes_in(lane):
+            if note.held and not note.completed:
+                return note
+        return None
+
+    def long_lane_mask(self):
+        """Bitmask of lanes occupied by an active long note; only lanes with a bit set are checked."""
+        pending = self.long_mask
+        while pending:
+            bit = pending & -pending
+            pending ^= bit
+            self.long_notes_in(bit.bit_length() - 1)
+        return self.long_mask
+
+    def expire(self, miss_x):
+        """Pop and return every lane head that has scrolled past miss_x unjudged."""
+        expired = []
+        for lane in range(self.num_lanes):
+            note = self.head(lane)
+            while note is not None and note.pos.x < miss_x:
+                expired.append(self.pop_head(lane))
+                note = self.head(lane)
+        return expired
+
+    def expire_before(self, miss_time):
+        """Pop and return every lane head whose hit time is earlier than miss_time."""
+        expired = []
+        for lane in range(self.num_lanes):
+            note = self.head(lane)
+            while note is not None and note.hit_time < miss_time:
+                expired.append(self.pop_head(lane))
+                note = self.head(lane)
+        return expired
+
+    def cull(self, now):
+        """Drop inactive notes from the draw list and recycle them once past their despawn time."""
+        live = []
+        for note in self.notes:
+            if note.active:
+                live.append(note)
+            else:
+                self.retired.append(note)
+        self.notes.clear()
+        self.notes.extend(live)
+        self.recycle_before(now)
+
+    def cull_before(self, now):
+        """Drop notes from the front of the spawn-ordered draw list once inactive or off screen.
+
+        Inactive notes further back are skipped when drawing and reach the front soon enough.
+        Dropped notes are recycled once past their despawn time.
+        """
+        notes, retired = self.notes, self.retired
+        while notes and (not notes[0].active or notes[0].despawn_time <= now):
+            note = notes.popleft()
+            note.active = False
+            retired.append(note)
+        self.recycle_before(now)
+
+    def recycle_before(self, now):
+        """Recycle retired notes from the front of the queue whose despawn time has passed."""
+        retired = self.retired
+        while retired and retired[0].despawn_time <= now:
+            self.recycle(retired.popleft())
+
+    def recycle(self, note):
+        """Forget a despawned note and return it to its pool."""
+        lane = note.lane
+        queue = self.long_notes[lane]
+        if note in queue:
+            queue.remove(note)
+            if not queue:
+                self.long_mask &= ~(1 << lane)
+        if note.chord_id is not None:
+            self.chords.release(note.chord_id)  # Chords with long notes are never completed by hits
+        note.pool.release(note)
@@ -1,9 +1,18 @@
 import random
-from objects import ShortNote, LongNote
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+import numpy as np
+from objects import ShortNote, LongNote, NOTE_LEAD_TIME, SPAWN_X, DESPAWN_X
+from charts import ChartEntry, SHORT, LONG
 
 class NoteLogic:
-    def __init__(self, config):
+    finished = False  # Generated charts never run out
+    MAX_DIFFICULTY = 10
+
+    def __init__(self, config, rng=None):
         self.config = config
+        # Injectable RNG so a seed reproduces the same chart
+        self.rng = rng if rng is not None else random.Random()
         self.spawn_time = 0
         self.base_spawn_interval = config['SPAWN_INTERVAL']
         self.difficulty_timer = 0
@@ -19,82 +28,190 @@ class NoteLogic:
             {'type': 'long', 'weight': 5},
             {'type': 'burst', 'weight': 10}
         ]
+        self.build_tables(config.get('PATTERN_WEIGHTS', {}))
+
+    def build_tables(self, level_weights=None):
+        """Precompute everything that depends only on the difficulty level.
+
+        level_weights optionally maps a level to its own list of pattern weights;
+        other levels use the weights in self.patterns.
+        """
+        level_weights = level_weights or {}
+        default = [p['weight'] for p in self.patterns]
+        levels = range(self.MAX_DIFFICULTY + 1)
+        self.spawn_intervals = [max(self.base_spawn_interval - (level * 50), 500) for level in levels]
+        self.cumulative_weights = [list(accumulate(level_weights.get(level, default))) for level in levels]
+
+        num_lanes = self.config['NUM_LANES']
+        self.all_lanes_mask = (1 << num_lanes) - 1
+        # Lanes, in ascending order, for every possible availability bitmask
+        self.mask_lanes = [tuple(lane for lane in range(num_lanes) if mask >> lane & 1)
+                           for mask in range(1 << num_lanes)]
+        self.cooldown_mask = 0  # Lanes spawned within min_spawn_interval
+        self.lane_ready_time = [0] * num_lanes
 
     def get_spawn_interval(self):
         """Dynamically adjust spawn interval based on difficulty"""
-        min_interval = 500
-        return max(self.base_spawn_interval - (self.current_difficulty * 50), min_interval)
+        return self.spawn_intervals[self.current_difficulty]
 
     def update_difficulty(self, current_time):
         """Increase difficulty every 30 seconds"""
         if (current_time - self.difficulty_timer) > 30000:
-            self.current_difficulty = min(self.current_difficulty + 1, 10)
+            self.current_difficulty = min(self.current_difficulty + 1, self.MAX_DIFFICULTY)
             self.difficulty_timer = current_time
 
     def select_pattern(self):
-        """Select pattern with weighted probabilities"""
-        total = sum(p['weight'] for p in self.patterns)
-        r = random.uniform(0, total)
-        upto = 0
-        for pattern in self.patterns:
-            if upto + pattern['weight'] >= r:
-                return pattern
-            upto += pattern['weight']
-        return self.patterns[0]
-
-    def get_available_lanes(self, current_time, pattern_type, active_notes):
-        """Get lanes available for spawning based on last spawn time and active long notes"""
-        num_lanes = self.config['NUM_LANES']
+        """Select pattern with weighted probabilities via bisect on the level's cumulative weights"""
+        cumulative = self.cumulative_weights[self.current_difficulty]
+        r = self.rng.uniform(0, cumulative[-1])
+        return self.patterns[min(bisect_left(cumulative, r), len(self.patterns) - 1)]
+
+    def ready_lane_mask(self, current_time):
+        """Bitmask of lanes whose last spawn is at least min_spawn_interval old"""
+        pending = self.cooldown_mask
+        while pending:
+            bit = pending & -pending
+            pending ^= bit
+            if current_time >= self.lane_ready_time[bit.bit_length() - 1]:
+                self.cooldown_mask &= ~bit
+        return self.all_lanes_mask & ~self.cooldown_mask
+
+    def mark_spawned(self, lane, current_time):
+        self.last_spawn_time[lane] = current_time
+        self.lane_ready_time[lane] = current_time + self.min_spawn_interval
+        self.cooldown_mask |= 1 << lane
+
+    @staticmethod
+    def required_lanes(pattern_type):
+        """Number of free lanes a pattern needs before it can spawn"""
         match pattern_type:
             case 'single':
-                required = 1
+                return 1
             case 'double':
-                required = 2
+                return 2
             case 'triple':
-                required = 3
+                return 3
             case 'long' | 'burst':
-                required = 1
+                return 1
             case _:
-                required = 1
+                return 1
 
-        # Exclude lanes with active long notes
-        active_long_note_lanes = {note.lane for note in active_notes if isinstance(note, LongNote) and note.active}
+    def get_available_lanes(self, current_time, pattern_type, note_field):
+        """Get lanes available for spawning based on last spawn time and active long notes"""
+        required = self.required_lanes(pattern_type)
 
-        available = [lane for lane in range(num_lanes) 
-                    if (current_time - self.last_spawn_time[lane]) >= self.min_spawn_interval and lane not in active_long_note_lanes]
+        # Exclude lanes with active long notes
+        available = self.mask_lanes[self.ready_lane_mask(current_time) & ~note_field.long_lane_mask()]
         
         if len(available) >= required:
             if pattern_type == 'burst':
-                return random.sample(available, min(3, len(available)))
-            return random.sample(available, required)
+                return self.rng.sample(available, min(3, len(available)))
+            return self.rng.sample(available, required)
         return []
 
-    def generate_notes(self, current_time, active_notes):
+    def generate_notes(self, current_time, note_field):
         new_notes = []
         self.update_difficulty(current_time)
 
         if current_time - self.spawn_time >= self.get_spawn_interval():
             pattern = self.select_pattern()
             if lanes := self.get_available_lanes(
-                current_time, pattern['type'], active_notes
+                current_time, pattern['type'], note_field
             ):
+                hit_time = current_time + NOTE_LEAD_TIME
                 if pattern['type'] == 'burst':
                     for lane in lanes:
-                        note = ShortNote(lane)
-                        new_notes.append(note)
-                        self.last_spawn_time[lane] = current_time
+                        new_notes.append(ShortNote.pool.acquire(lane, hit_time))
+                        self.mark_spawned(lane, current_time)
                 else:
-                    chord_id = random.randint(1000, 9999)
                     for lane in lanes:
                         if pattern['type'] == 'long':
-                            length = self.config['NOTE_SPEED'] * (1 + random.random())
-                            new_notes.append(LongNote(lane, length))
+                            length = self.config['NOTE_SPEED'] * (1 + self.rng.random())
+                            new_notes.append(LongNote.pool.acquire(lane, length, hit_time))
                         else:
-                            note = ShortNote(lane)
-                            note.chord_id = chord_id if len(lanes) > 1 else None
-                            new_notes.append(note)
-                        self.last_spawn_time[lane] = current_time
+                            new_notes.append(ShortNote.pool.acquire(lane, hit_time))
+                        self.mark_spawned(lane, current_time)
+                    if len(new_notes) > 1:
+                        note_field.chords.create(new_notes)
 
                 self.spawn_time = current_time
 
-        return new_notes
\ No newline at end of file
+        return new_notes
+
+    # --------------------------
+    # Offline Chart Generation
+    # --------------------------
+
+    def generate_chart(self, duration_ms, seed, difficulty_curve=None, batch=512):
+        """Generate a whole chart in one call and return its ChartEntry list.
+
+        Follows the same rules as generate_notes (spawn interval per difficulty,
+        MIN_PADDING, long notes blocking their lane, the level's pattern weights)
+        but jumps from one spawn to the next instead of polling every frame.
+        Pattern rolls, lane orders and long-note lengths are drawn from a NumPy
+        generator seeded with `seed` in batches. difficulty_curve is a list of
+        (start_ms, level) pairs sorted by start; by default the level rises by
+        one every 30 seconds up to 10, like the live game.
+        """
+        if difficulty_curve is None:
+            difficulty_curve = [(i * 30000, min(i + 1, 10)) for i in range(int(duration_ms // 30000) + 1)]
+        curve_starts = [start for start, _ in difficulty_curve]
+        curve_levels = [min(max(level, 0), self.MAX_DIFFICULTY) for _, level in difficulty_curve]
+
+        num_lanes = self.config['NUM_LANES']
+        note_speed = self.config['NOTE_SPEED']
+        types = [p['type'] for p in self.patterns]
+        required = [self.required_lanes(t) for t in types]
+        rng = np.random.default_rng(seed)
+
+        def draw_batch():
+            return (rng.random(batch).tolist(),
+                    np.argsort(rng.random((batch, num_lanes)), axis=1).tolist(),
+                    (note_speed * (1 + rng.random(batch))).tolist())
+
+        def level_at(t):
+            return curve_levels[max(bisect_right(curve_starts, t) - 1, 0)]
+
+        rolls, lane_orders, lengths = draw_batch()
+        k = 0
+        entries = []
+        chord_id = 0
+        last_spawn = [-self.min_spawn_interval] * num_lanes
+        blocked_until = [0.0] * num_lanes  # Lanes held by a long note until it leaves the screen
+        t = float(self.spawn_intervals[level_at(0)])
+
+        while t + NOTE_LEAD_TIME < duration_ms:
+            if k == batch:
+                rolls, lane_orders, lengths = draw_batch()
+                k = 0
+            cumulative = self.cumulative_weights[level_at(t)]
+            choice = min(bisect_left(cumulative, rolls[k] * cumulative[-1]), len(types) - 1)
+            pattern, need = types[choice], required[choice]
+            order, length = lane_orders[k], lengths[k]
+            k += 1
+
+            available = [lane for lane in order
+                         if t - last_spawn[lane] >= self.min_spawn_interval and blocked_until[lane] <= t]
+            if len(available) < need:
+                # Live play rerolls on the next frame; jump to when a lane frees up instead
+                if not available:
+                    t = max(t, min(max(b, l + self.min_spawn_interval) for b, l in zip(blocked_until, last_spawn)))
+                continue
+
+            lanes = available[:3] if pattern == 'burst' else available[:need]
+            hit_time = t + NOTE_LEAD_TIME
+            chord = 0
+            if pattern in ('double', 'triple'):
+                chord_id += 1
+                chord = chord_id
+            for lane in sorted(lanes):
+                if pattern == 'long':
+                    entries.append(ChartEntry(hit_time, lane, LONG, length / note_speed * 1000, 0))
+                    blocked_until[lane] = t + (SPAWN_X - DESPAWN_X + length) / note_speed * 1000
+                else:
+                    entries.append(ChartEntry(hit_time, lane, SHORT, 0.0, chord))
+                last_spawn[lane] = t
+
+            t += self.spawn_intervals[level_at(t)]
+
+        return entries
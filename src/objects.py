@@ -1,66 +1,106 @@
 import pygame
-import random
 from pygame.math import Vector2
 from config import (
-    SCREEN_WIDTH, NOTE_SPEED, 
+    SCREEN_WIDTH, NOTE_SPEED, NOTE_RADIUS, HIT_ZONE_X, NOTE_POOL_SIZE, POPUP_POOL_SIZE,
     lane_positions, lane_colors
 )
+from sprites import get_note_sprite
+from fonts import draw_text
 
-class Particle:
-    def __init__(self, position, color):
-        self.pos = Vector2(position)
-        self.color = color
-        self.velocity = Vector2(random.uniform(-3, 3), random.uniform(-3, 3))
-        self.lifetime = 255
-        self.size = random.randint(3, 6)
+SPAWN_X = SCREEN_WIDTH + 50
+DESPAWN_X = -50
+# Milliseconds a note takes to scroll from its spawn point to the hit zone
+NOTE_LEAD_TIME = (SPAWN_X - HIT_ZONE_X) / NOTE_SPEED * 1000
 
-    def update(self):
-        self.pos += self.velocity
-        self.lifetime -= 8
-        self.size = max(self.size - 0.1, 1)
+# --------------------------
+# Object Pools
+# --------------------------
 
-    def draw(self, surface):
-        if self.lifetime > 0:
-            alpha = min(self.lifetime, 255)
-            radius = int(self.size)
-            s = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
-            pygame.draw.circle(s, (*self.color, alpha), (radius, radius), radius)
-            surface.blit(s, (self.pos.x - radius, self.pos.y - radius))
+class Pool:
+    """Free list of released instances of one class; acquire() resets and hands them out again.
+
+    Pooled classes take their constructor arguments in reset() as well. An
+    instance must only be released once nothing else refers to it.
+    """
+
+    def __init__(self, cls, capacity):
+        self.cls = cls
+        self.capacity = capacity
+        self.free = []
+        self.hits = self.misses = 0
+
+    def acquire(self, *args):
+        if self.free:
+            self.hits += 1
+            obj = self.free.pop()
+            obj.reset(*args)
+            return obj
+        self.misses += 1
+        return self.cls(*args)
+
+    def release(self, obj):
+        if len(self.free) < self.capacity:
+            self.free.append(obj)
+
+    def clear(self):
+        self.free.clear()
+        self.hits = self.misses = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"acquired": total, "hit_rate": round(self.hits / total, 3) if total else 0.0, "free": len(self.free)}
+
+# --------------------------
+# Notes and Popups
+# --------------------------
 
 class ShortNote:
-    def __init__(self, lane):
+    __slots__ = ("lane", "pos", "color", "active", "hit", "chord_id", "hit_time", "despawn_time")
+
+    def __init__(self, lane, hit_time=None):
+        self.pos = Vector2()
+        self.reset(lane, hit_time)
+
+    def reset(self, lane, hit_time=None):
         self.lane = lane
-        self.pos = Vector2(SCREEN_WIDTH + 50, lane_positions[lane])
+        self.pos.update(SPAWN_X, lane_positions[lane])
         self.color = lane_colors[lane]
         self.active = True
         self.hit = False
         self.chord_id = None
+        # Song time (ms) at which the note reaches the hit zone
+        self.hit_time = hit_time
+        if hit_time is not None:
+            self.despawn_time = hit_time + (HIT_ZONE_X - DESPAWN_X) / NOTE_SPEED * 1000
 
     def update(self, dt):
         self.pos.x -= NOTE_SPEED * dt
-        if self.pos.x < -50:
+        if self.pos.x < DESPAWN_X:
             self.active = False
 
-    def draw(self, surface):
+    def sync(self, song_time):
+        """Place the note from its hit timestamp instead of integrating its speed."""
+        self.pos.x = HIT_ZONE_X + (self.hit_time - song_time) * NOTE_SPEED / 1000
+
+    def draw(self, surface, offset_x=0):
+        """Draw the note and return the rect it covers, or None if inactive."""
         if self.active:
-            glow_size = 80
-            glow = pygame.Surface((glow_size, glow_size), pygame.SRCALPHA)
-            glow.fill((0, 0, 0, 0))
-            for i in range(10):
-                alpha = max(255 - i * 25, 0)
-                radius = 20 + i * 3
-                pygame.draw.circle(glow, (*self.color, alpha), (glow_size//2, glow_size//2), radius)
-            mask = pygame.Surface((glow_size, glow_size), pygame.SRCALPHA)
-            pygame.draw.circle(mask, (255, 255, 255), (glow_size//2, glow_size//2), glow_size//2)
-            glow.blit(mask, (0, 0), None, pygame.BLEND_RGBA_MULT)
-            surface.blit(glow, (int(self.pos.x)-glow_size//2, int(self.pos.y)-glow_size//2))
-            pygame.draw.circle(surface, self.color, (int(self.pos.x), int(self.pos.y)), 20)
+            sprite = get_note_sprite(self.color)
+            return surface.blit(sprite, sprite.get_rect(center=(int(self.pos.x - offset_x), int(self.pos.y))))
+        return None
 
 class LongNote:
-    def __init__(self, lane, length):
+    __slots__ = ("lane", "length", "pos", "tail_x", "color", "active", "held", "completed", "hold_progress",
+                 "start_hold_time", "chord_id", "hit_time", "tail_time", "despawn_time")
+
+    def __init__(self, lane, length, hit_time=None):
+        self.pos = Vector2()
+        self.reset(lane, length, hit_time)
+
+    def reset(self, lane, length, hit_time=None):
         self.lane = lane
         self.length = length
-        self.pos = Vector2(SCREEN_WIDTH + 50, lane_positions[lane])
+        self.pos.update(SPAWN_X, lane_positions[lane])
         self.tail_x = self.pos.x + length
         self.color = lane_colors[lane]
         self.active = True
@@ -69,32 +109,53 @@ class LongNote:
         self.hold_progress = 0.0
         self.start_hold_time = 0
         self.chord_id = None
+        # Song times (ms) at which the head and the tail reach the hit zone
+        self.hit_time = hit_time
+        if hit_time is not None:
+            self.tail_time = hit_time + length / NOTE_SPEED * 1000
+            self.despawn_time = self.tail_time + (HIT_ZONE_X - DESPAWN_X) / NOTE_SPEED * 1000
 
     def update(self, dt):
         self.pos.x -= NOTE_SPEED * dt
         self.tail_x -= NOTE_SPEED * dt
-        if self.tail_x < -50:
+        if self.tail_x < DESPAWN_X:
             self.active = False
 
-    def draw(self, surface):
+    def sync(self, song_time):
+        """Place the note from its hit timestamp instead of integrating its speed."""
+        self.pos.x = HIT_ZONE_X + (self.hit_time - song_time) * NOTE_SPEED / 1000
+        self.tail_x = self.pos.x + self.length
+
+    def draw(self, surface, offset_x=0):
+        """Draw the note and return the rect it covers, or None if inactive."""
         if self.active:
-            body_width = self.tail_x - self.pos.x
-            pygame.draw.rect(surface, self.color, (self.pos.x, self.pos.y-20, body_width, 40))
-            pygame.draw.circle(surface, self.color, (int(self.pos.x), int(self.pos.y)), 20)
-            pygame.draw.circle(surface, self.color, (int(self.tail_x), int(self.pos.y)), 20)
+            x = self.pos.x - offset_x
+            tail_x = self.tail_x - offset_x
+            body_width = tail_x - x
+            pygame.draw.rect(surface, self.color, (x, self.pos.y-NOTE_RADIUS, body_width, NOTE_RADIUS*2))
+            pygame.draw.circle(surface, self.color, (int(x), int(self.pos.y)), NOTE_RADIUS)
+            pygame.draw.circle(surface, self.color, (int(tail_x), int(self.pos.y)), NOTE_RADIUS)
             if self.held:
                 progress_width = body_width * self.hold_progress
-                progress_surface = pygame.Surface((int(progress_width), 40), pygame.SRCALPHA)
+                progress_surface = pygame.Surface((int(progress_width), NOTE_RADIUS*2), pygame.SRCALPHA)
                 progress_surface.fill((255, 255, 255, 128))
-                surface.blit(progress_surface, (self.pos.x, self.pos.y-20))
+                surface.blit(progress_surface, (x, self.pos.y-NOTE_RADIUS))
+            return pygame.Rect(int(x) - NOTE_RADIUS, int(self.pos.y) - NOTE_RADIUS,
+                               int(tail_x) - int(x) + NOTE_RADIUS * 2 + 1, NOTE_RADIUS * 2 + 1)
+        return None
 
 class HitPopup:
+    __slots__ = ("text", "pos", "lifetime", "max_lifetime", "color")
+
     def __init__(self, text, position, color):
+        self.pos = Vector2()
+        self.reset(text, position, color)
+
+    def reset(self, text, position, color):
         self.text = text
-        self.pos = Vector2(position)
+        self.pos.update(position)
         self.lifetime = 1.0
         self.max_lifetime = 1.0
-        self.font = pygame.font.SysFont("Segoe UI", 36)
         self.color = color
 
     def update(self, dt):
@@ -104,7 +165,28 @@ class HitPopup:
     def draw(self, surface):
         if self.lifetime > 0:
             alpha = int(255 * (self.lifetime / self.max_lifetime))
-            text_surface = self.font.render(self.text, True, self.color)
-            text_surface.set_alpha(alpha)
-            rect = text_surface.get_rect(center=(self.pos.x, self.pos.y))
-            surface.blit(text_surface, rect)
\ No newline at end of file
+            return draw_text(surface, self.text, self.color, alpha=alpha, center=(self.pos.x, self.pos.y))
+
+ShortNote.pool = Pool(ShortNote, NOTE_POOL_SIZE)
+LongNote.pool = Pool(LongNote, NOTE_POOL_SIZE)
+HitPopup.pool = Pool(HitPopup, POPUP_POOL_SIZE)
+POOLS = {"short notes": ShortNote.pool, "long notes": LongNote.pool, "popups": HitPopup.pool}
+
+def update_popups(popups, dt):
+    """Return expired popups to the pool and age the rest.
+
+    `popups` is a deque in spawn order; every popup lives equally long, so
+    the expired ones are always at the front.
+    """
+    while popups and popups[0].lifetime <= 0:
+        HitPopup.pool.release(popups.popleft())
+    for popup in popups:
+        popup.update(dt)
+
+def clear_popups(popups):
+    """Return every popup to the pool and empty `popups`."""
+    while popups:
+        HitPopup.pool.release(popups.pop())
+
+def pool_stats():
+    return {name: pool.stats() for name, pool in POOLS.items()}
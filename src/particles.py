@@ -0,0 +1,104 @@
+import numpy as np
+import pygame
+from utils import display_format
+from config import MAX_PARTICLES, PARTICLES_PER_BURST
+
+class ParticleSystem:
+    """Fixed-capacity particle pool stored as parallel NumPy arrays."""
+
+    def __init__(self, capacity=MAX_PARTICLES, rng=None):
+        self.capacity = capacity
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.velocity = np.zeros((capacity, 2), dtype=np.float32)
+        self.lifetime = np.zeros(capacity, dtype=np.int16)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.color_index = np.zeros(capacity, dtype=np.uint8)
+        self.count = 0
+        self.palette = []
+        self._palette_lookup = {}
+        self._sprites = {}
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def seed(self, seed):
+        """Restart the spawn RNG so bursts are reproducible."""
+        self.rng = np.random.default_rng(seed)
+
+    def _color_slot(self, color):
+        color = tuple(color)
+        slot = self._palette_lookup.get(color)
+        if slot is None:
+            slot = self._palette_lookup[color] = len(self.palette)
+            self.palette.append(color)
+        return slot
+
+    def emit(self, position, color, count=PARTICLES_PER_BURST):
+        """Spawn a burst of particles; anything beyond the pool capacity is dropped."""
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return
+        start, end = self.count, self.count + count
+        self.pos[start:end] = position
+        self.velocity[start:end] = self.rng.uniform(-3, 3, (count, 2))
+        self.lifetime[start:end] = 255
+        self.size[start:end] = self.rng.integers(3, 7, count)
+        self.color_index[start:end] = self._color_slot(color)
+        self.count = end
+
+    def update(self):
+        """Advance every live particle one step and compact away the dead ones."""
+        n = self.count
+        if n == 0:
+            return
+        self.pos[:n] += self.velocity[:n]
+        self.lifetime[:n] -= 8
+        np.maximum(self.size[:n] - 0.1, 1, out=self.size[:n])
+
+        alive = np.flatnonzero(self.lifetime[:n] > 0)
+        if len(alive) < n:
+            k = len(alive)
+            self.pos[:k] = self.pos[alive]
+            self.velocity[:k] = self.velocity[alive]
+            self.lifetime[:k] = self.lifetime[alive]
+            self.size[:k] = self.size[alive]
+            self.color_index[:k] = self.color_index[alive]
+            self.count = k
+
+    def _sprite(self, color_slot, radius, alpha):
+        key = (color_slot, radius, alpha)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(sprite, (*self.palette[color_slot], alpha), (radius, radius), radius)
+            sprite = self._sprites[key] = display_format(sprite)
+        return sprite
+
+    def draw(self, surface):
+        """Draw every live particle; returns one bounding rect per color in use."""
+        n = self.count
+        if n == 0:
+            return []
+        radii = self.size[:n].astype(np.int32)
+        alphas = np.minimum(self.lifetime[:n], 255)
+        xs = (self.pos[:n, 0] - radii).astype(np.int32)
+        ys = (self.pos[:n, 1] - radii).astype(np.int32)
+        sprite = self._sprite
+        surface.blits(
+            [(sprite(c, r, a), (x, y)) for c, r, a, x, y in zip(
+                self.color_index[:n].tolist(), radii.tolist(), alphas.tolist(), xs.tolist(), ys.tolist())],
+            doreturn=False,
+        )
+        # Bursts share their lane's color, so per-color bounds stay tight around each burst
+        colors = self.color_index[:n]
+        rights, bottoms = xs + radii * 2, ys + radii * 2
+        rects = []
+        for slot in np.unique(colors).tolist():
+            mask = colors == slot
+            left, top = int(xs[mask].min()), int(ys[mask].min())
+            rects.append(pygame.Rect(left, top, int(rights[mask].max()) - left, int(bottoms[mask].max()) - top))
+        return rects
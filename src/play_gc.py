@@ -0,0 +1,63 @@
+import gc
+from config import GC_MODE, GC_GEN0_THRESHOLD
+
+# --------------------------
+# Garbage Collection During Play
+# --------------------------
+
+GC_MODES = ("default", "tuned", "off")
+
+def gc_collections():
+    """Collections run so far across all generations."""
+    return sum(stats["collections"] for stats in gc.get_stats())
+
+class PlayGC:
+    """Applies GC_MODE to the cyclic garbage collector for the length of a session.
+
+        "default"   leave the collector alone
+        "tuned"     freeze everything alive at start() out of the collector's
+                    reach and collect the young generation less often
+        "off"       freeze, then disable the collector until stop(); idle()
+                    (the game pauses) and stop() run the collections instead
+
+    Notes, popups and particles form no reference cycles, so play itself
+    leaves nothing for the collector; what it would scan is mostly the
+    long-lived objects frozen here.
+    """
+
+    def __init__(self, mode=GC_MODE):
+        if mode not in GC_MODES:
+            raise ValueError(f"unknown GC mode {mode!r}")
+        self.mode = mode
+        self.threshold = gc.get_threshold()
+        self.was_enabled = gc.isenabled()
+        self.start_collections = 0
+
+    def start(self):
+        self.threshold = gc.get_threshold()
+        self.was_enabled = gc.isenabled()
+        if self.mode != "default":
+            gc.collect()
+            gc.freeze()
+            if self.mode == "tuned":
+                gc.set_threshold(GC_GEN0_THRESHOLD, *self.threshold[1:])
+            else:
+                gc.disable()
+        self.start_collections = gc_collections()
+
+    def idle(self):
+        """Catch up on collection while nothing time-critical is running."""
+        if self.mode == "off":
+            gc.collect()
+
+    def stop(self):
+        if self.mode != "default":
+            gc.unfreeze()
+            gc.set_threshold(*self.threshold)
+            if self.was_enabled:
+                gc.enable()
+            if self.mode == "off":
+                gc.collect()
+
+    def stats(self):
+        return {"mode": self.mode, "collections": gc_collections() - self.start_collections}
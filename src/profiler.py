@@ -0,0 +1,206 @@
+import csv
+import json
+import time
+import numpy as np
+import pygame
+from fonts import get_font
+from objects import pool_stats
+from play_gc import gc_collections
+from config import GAMEPLAY_FPS, PROFILER_WINDOW, PROFILER_REFRESH
+
+# --------------------------
+# Frame Profiler
+# --------------------------
+
+PHASES = (
+    "events", "note generation", "note update", "particle update", "track",
+    "note draw", "particle draw", "ui", "rush bar", "popups", "overlay", "flip",
+)
+DROPPED_FRAME_FACTOR = 1.5  # A frame longer than this many frame budgets counts as dropped
+
+class FrameProfiler:
+    """Splits every frame into PHASES and keeps rolling percentiles of each.
+
+    The game loop calls begin_frame() after the frame-rate sleep, lap(phase)
+    at the end of each phase and end_frame() after the flip. Time spent inside
+    a TimedSource during a phase is booked to "note generation" instead.
+    Timings of the last PROFILER_WINDOW frames are kept in a ring buffer; every
+    frame can also be streamed to a CSV log, and a JSON log gets the summary
+    when the profiler is closed. A LatencyMonitor passed as `latency` and the
+    FrameScheduler passed as `pacing` are shown and logged alongside.
+    """
+
+    def __init__(self, window=PROFILER_WINDOW, log_path=None, frame_budget_ms=1000 / GAMEPLAY_FPS, latency=None,
+                 pacing=None):
+        self.index = {phase: i for i, phase in enumerate(PHASES)}
+        self.samples = np.zeros((window, len(PHASES) + 1), dtype=np.float32)  # Last column is the frame total
+        self.window = window
+        self.frames = 0
+        self.dropped = 0
+        self.frame_budget_ms = frame_budget_ms
+        self.current = [0.0] * len(PHASES)
+        self.nested = 0.0
+        self.frame_start = self.last = 0.0
+        self.counts = (0, 0, 0)
+        self.max_counts = [0, 0, 0]
+        self.overlay = None
+        self.latency = latency
+        self.pacing = pacing
+        self.start_collections = gc_collections()
+
+        self.log_path = log_path
+        self._csv = self._csv_file = None
+        if log_path and log_path.endswith(".csv"):
+            self._csv_file = open(log_path, "w", newline="")
+            self._csv = csv.writer(self._csv_file)
+            self._csv.writerow(["frame", *PHASES, "total", "interval", "notes", "particles", "popups", "dropped"])
+
+    def begin_frame(self):
+        self.frame_start = self.last = time.perf_counter()
+        self.current = [0.0] * len(PHASES)
+        self.nested = 0.0
+
+    def lap(self, phase):
+        """Book the time since the previous lap to `phase`."""
+        now = time.perf_counter()
+        self.current[self.index[phase]] += (now - self.last) * 1000 - self.nested
+        self.nested = 0.0
+        self.last = now
+
+    def add(self, phase, ms):
+        """Book time measured inside another phase, which is then taken out of that phase."""
+        self.current[self.index[phase]] += ms
+        self.nested += ms
+
+    def end_frame(self, interval_ms, notes, particles, popups):
+        """Store the finished frame; interval_ms is the full frame-to-frame time from the game clock."""
+        total = (time.perf_counter() - self.frame_start) * 1000
+        row = self.samples[self.frames % self.window]
+        row[:-1] = self.current
+        row[-1] = total
+        self.frames += 1
+        dropped = interval_ms > self.frame_budget_ms * DROPPED_FRAME_FACTOR
+        self.dropped += dropped
+        self.counts = (notes, particles, popups)
+        self.max_counts = [max(a, b) for a, b in zip(self.max_counts, self.counts)]
+        if self._csv is not None:
+            self._csv.writerow([self.frames, *(f"{ms:.3f}" for ms in self.current), f"{total:.3f}",
+                                f"{interval_ms:.3f}", notes, particles, popups, int(dropped)])
+        if self.overlay is not None and self.frames % PROFILER_REFRESH == 0:
+            self.overlay = None  # Re-rendered on the next draw_overlay
+
+    def percentiles(self):
+        """p50/p95/p99 in ms of every phase and the frame total over the window, shape (3, phases + 1)."""
+        n = min(self.frames, self.window)
+        if n == 0:
+            return np.zeros((3, len(PHASES) + 1))
+        return np.percentile(self.samples[:n], (50, 95, 99), axis=0)
+
+    def summary(self):
+        stats = self.percentiles()
+        names = (*PHASES, "total")
+        return {
+            "frames": self.frames,
+            "dropped_frames": self.dropped,
+            "window": min(self.frames, self.window),
+            "phases_ms": {name: {"p50": round(float(stats[0, i]), 3), "p95": round(float(stats[1, i]), 3),
+                                 "p99": round(float(stats[2, i]), 3)} for i, name in enumerate(names)},
+            "max_counts": dict(zip(("notes", "particles", "popups"), self.max_counts)),
+            "latency_ms": self.latency.summary() if self.latency is not None else {},
+            "frame_pacing": self.pacing.stability() if self.pacing is not None else {},
+            "pools": pool_stats(),
+            "gc_collections": gc_collections() - self.start_collections,
+        }
+
+    def close(self):
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv = self._csv_file = None
+        elif self.log_path:
+            with open(self.log_path, "w") as f:
+                json.dump(self.summary(), f, indent=2)
+
+    # --------------------------
+    # Overlay
+    # --------------------------
+
+    def _render_overlay(self):
+        font = get_font("Consolas", 16)
+        color = (230, 230, 230)
+        stats = self.percentiles()
+        notes, particles, popups = self.counts
+        rows = [("phase", "p50", "p95", "p99")]
+        rows += [(name, *(f"{stats[k, i]:.2f}" for k in range(3))) for i, name in enumerate((*PHASES, "total"))]
+        footer = [f"notes {notes}  particles {particles}  popups {popups}",
+                  f"dropped {self.dropped} / {self.frames} frames",
+                  "pool hits " + "  ".join(f"{name} {stats['hit_rate'] * 100:.0f}%"
+                                           for name, stats in pool_stats().items()) +
+                  f"  gc {gc_collections() - self.start_collections}"]
+        if self.latency is not None:
+            footer += self.latency.lines()
+        if self.pacing is not None:
+            footer += self.pacing.lines()
+
+        # Columns are placed explicitly since the fallback font may not be monospaced
+        line_height = font.get_linesize()
+        name_width = max(font.size(row[0])[0] for row in rows) + 10
+        column_width = font.size("000.00")[0] + 10
+        width = max(name_width + 3 * column_width, *(font.size(line)[0] for line in footer)) + 20
+        panel = pygame.Surface((width, line_height * (len(rows) + len(footer)) + 20), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        y = 10
+        for row in rows:
+            panel.blit(font.render(row[0], True, color), (10, y))
+            for k, cell in enumerate(row[1:], 1):
+                text = font.render(cell, True, color)
+                panel.blit(text, text.get_rect(topright=(10 + name_width + k * column_width, y)))
+            y += line_height
+        for line in footer:
+            panel.blit(font.render(line, True, color), (10, y))
+            y += line_height
+        return panel
+
+    def draw_overlay(self, surface):
+        if self.overlay is None:
+            self.overlay = self._render_overlay()
+        return surface.blit(self.overlay, self.overlay.get_rect(topright=(surface.get_width() - 10, 10)))
+
+class NullProfiler:
+    """Stands in for FrameProfiler while profiling is off, so the game loop pays only no-op calls."""
+
+    def begin_frame(self):
+        pass
+
+    def lap(self, phase):
+        pass
+
+    def add(self, phase, ms):
+        pass
+
+    def end_frame(self, interval_ms, notes, particles, popups):
+        pass
+
+    def draw_overlay(self, surface):
+        return None
+
+    def close(self):
+        pass
+
+NULL_PROFILER = NullProfiler()
+
+class TimedSource:
+    """Wraps a note source and books its generate_notes time to the "note generation" phase."""
+
+    def __init__(self, source, profiler):
+        self.source = source
+        self.profiler = profiler
+
+    @property
+    def finished(self):
+        return self.source.finished
+
+    def generate_notes(self, current_time, note_field):
+        start = time.perf_counter()
+        notes = self.source.generate_notes(current_time, note_field)
+        self.profiler.add("note generation", (time.perf_counter() - start) * 1000)
+        return notes
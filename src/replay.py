@@ -0,0 +1,197 @@
+import argparse
+import os
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from simulation import GameSimulation, step_at
+from charts import ChartNoteSource
+from chart_cache import load_chart
+from config import REPLAY_DIR, SIM_STEP_MS
+
+# --------------------------
+# Replay Format
+# --------------------------
+#
+# A replay is everything needed to re-simulate a session: the NoteLogic seed,
+# the chart (empty for Infinite Mode), the simulation settings (including the
+# input delay misses wait for), the number of
+# fixed steps played, the score the client claims and every lane press and
+# release. Integers are LEB128 varints. Each input is one varint holding the
+# time since the previous input in ms, whether it was applied late, the lane
+# and the key direction:
+#
+#     (delta_ms << 4) | (late << 3) | (lane << 1) | pressed
+#
+# Input is judged at its time but applied on a fixed step, normally the
+# first one at or after that time. Input queued after the simulation had
+# stepped past its time (calibrated input, or a late frame) is applied on a
+# later step; for those, `late` is set and a second varint holds how many
+# steps later. Times are recorded in whole milliseconds and the simulation is
+# fed the same times and steps, so playing a replay back reproduces the
+# session exactly. JHR1 replays, which have no late bit, are still read.
+
+REPLAY_MAGIC = b"JHR2"
+REPLAY_MAGIC_V1 = b"JHR1"
+FLAG_CLOCK_TIMING = 1
+
+def write_varint(out, value):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+class Replay:
+    def __init__(self, seed, inputs, steps, score=0, chart="", note_timing="clock", step_ms=SIM_STEP_MS,
+                 input_delay=0):
+        self.seed = seed
+        self.inputs = inputs  # (time_ms, lane, pressed, step) sorted by time; step is None in JHR1 replays
+        self.steps = steps
+        self.score = score
+        self.chart = chart or ""
+        self.note_timing = note_timing
+        self.step_ms = step_ms
+        self.input_delay = input_delay
+
+    @classmethod
+    def from_simulation(cls, sim, chart=""):
+        return cls(sim.seed, list(sim.input_log), sim.step_index, sim.score, chart,
+                   "clock" if sim.clock_timing else "frame", sim.step_ms, sim.input_delay)
+
+    def encode(self):
+        out = bytearray(REPLAY_MAGIC)
+        write_varint(out, FLAG_CLOCK_TIMING if self.note_timing == "clock" else 0)
+        write_varint(out, round(self.step_ms * 1000))  # microseconds
+        write_varint(out, self.input_delay)
+        write_varint(out, self.seed)
+        chart = self.chart.encode("utf-8")
+        write_varint(out, len(chart))
+        out += chart
+        write_varint(out, self.steps)
+        write_varint(out, self.score)
+        write_varint(out, len(self.inputs))
+        last = 0
+        for input_time, lane, pressed, step in self.inputs:
+            if input_time != int(input_time) or input_time < last:
+                raise ValueError(f"input times must be whole ms in order, got {input_time} after {last}")
+            input_time = int(input_time)
+            lag = 0 if step is None else step - step_at(input_time, self.step_ms)
+            write_varint(out, (input_time - last) << 4 | (lag > 0) << 3 | lane << 1 | int(pressed))
+            if lag > 0:
+                write_varint(out, lag)
+            last = input_time
+        return bytes(out)
+
+    @classmethod
+    def decode(cls, data):
+        version = data[:4]
+        if version not in (REPLAY_MAGIC, REPLAY_MAGIC_V1):
+            raise ValueError("not a Jazz Hero replay")
+        pos = 4
+        flags, pos = read_varint(data, pos)
+        step_us, pos = read_varint(data, pos)
+        input_delay = 0
+        if version != REPLAY_MAGIC_V1:
+            input_delay, pos = read_varint(data, pos)
+        seed, pos = read_varint(data, pos)
+        chart_length, pos = read_varint(data, pos)
+        chart = data[pos:pos + chart_length].decode("utf-8")
+        pos += chart_length
+        steps, pos = read_varint(data, pos)
+        score, pos = read_varint(data, pos)
+        count, pos = read_varint(data, pos)
+        # The step is stored rounded to microseconds; map it back to the exact default
+        step_ms = SIM_STEP_MS if round(SIM_STEP_MS * 1000) == step_us else step_us / 1000
+        inputs = []
+        input_time = 0
+        for _ in range(count):
+            packed, pos = read_varint(data, pos)
+            if version == REPLAY_MAGIC_V1:
+                input_time += packed >> 3
+                inputs.append((input_time, packed >> 1 & 3, bool(packed & 1), None))
+                continue
+            input_time += packed >> 4
+            step = step_at(input_time, step_ms)
+            if packed & 8:
+                lag, pos = read_varint(data, pos)
+                step += lag
+            inputs.append((input_time, packed >> 1 & 3, bool(packed & 1), step))
+        return cls(seed, inputs, steps, score, chart,
+                   "clock" if flags & FLAG_CLOCK_TIMING else "frame", step_ms, input_delay)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.encode())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.decode(f.read())
+
+def save_replay(replay, directory=REPLAY_DIR):
+    """Save a replay under a timestamped name and return its path."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, datetime.now().strftime("%Y%m%d-%H%M%S") + f"-{replay.seed}.jhr")
+    replay.save(path)
+    return path
+
+# --------------------------
+# Playback
+# --------------------------
+
+def open_replay_chart(replay):
+    """Map the chart a replay was played on; a null context for Infinite Mode replays."""
+    return load_chart(replay.chart) if replay.chart else nullcontext()
+
+def replay_simulation(replay, chart):
+    """Build a fresh simulation for a replay with all of its input queued.
+
+    `chart` is the replay's chart from open_replay_chart(); the caller closes it.
+    """
+    note_generator = ChartNoteSource(chart.entries()) if replay.chart else None
+    sim = GameSimulation(note_generator, note_timing=replay.note_timing, seed=replay.seed, step_ms=replay.step_ms,
+                         input_delay=replay.input_delay)
+    for input_time, lane, pressed, step in replay.inputs:
+        sim.queue_input(lane, pressed, input_time, step)
+    return sim
+
+def simulate_replay(replay):
+    """Re-simulate a replay headlessly, as fast as possible, and return the finished simulation."""
+    with open_replay_chart(replay) as chart:
+        sim = replay_simulation(replay, chart)
+        for _ in range(replay.steps):
+            sim.step()
+            sim.events.clear()
+    return sim
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and play back Jazz Hero replays.")
+    parser.add_argument("replays", nargs="+")
+    parser.add_argument("--render", action="store_true", help="watch the replay in the game window")
+    args = parser.parse_args()
+
+    for path in args.replays:
+        replay = Replay.load(path)
+        if args.render:
+            from main import game  # Opens the game window
+            game(replay=replay)
+            continue
+        start = time.perf_counter()
+        sim = simulate_replay(replay)
+        elapsed = time.perf_counter() - start
+        played = replay.steps * replay.step_ms / 1000
+        status = "OK" if sim.score == replay.score else "MISMATCH"
+        print(f"{path}: {status} claimed {replay.score}, simulated {sim.score}; "
+              f"{len(replay.inputs)} inputs, {played:.1f}s played in {elapsed:.3f}s ({played / elapsed:.0f}x real time)")
+
+if __name__ == "__main__":
+    main()
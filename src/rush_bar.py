@@ -1,52 +1,86 @@
 import pygame
 import math
+from fonts import draw_text
+from utils import display_format
 from config import RUSH_MAX, RUSH_BAR_WIDTH, RUSH_BAR_HEIGHT, RUSH_BAR_X, RUSH_BAR_Y, SCREEN_WIDTH
 
+RUSH_PHASE_FRAMES = 32
+SHINE_HEIGHT = 10
+
+_normal_strip = None
+_rush_frames = None
+_shine_surface = None
+
+def _build_normal_strip():
+    strip = pygame.Surface((RUSH_BAR_WIDTH, RUSH_BAR_HEIGHT), pygame.SRCALPHA)
+    for y in range(RUSH_BAR_HEIGHT):
+        ratio = y / RUSH_BAR_HEIGHT
+        pygame.draw.line(strip, (50, int(200 - 50 * ratio), int(255 - 100 * ratio)), (0, y), (RUSH_BAR_WIDTH, y))
+    return display_format(strip)
+
+def _build_rush_frames():
+    """Pre-render one full-height pulsating strip per phase step of the sine wave."""
+    frames = []
+    for i in range(RUSH_PHASE_FRAMES):
+        phase = i / RUSH_PHASE_FRAMES * 2 * math.pi
+        strip = pygame.Surface((RUSH_BAR_WIDTH, RUSH_BAR_HEIGHT), pygame.SRCALPHA)
+        for y in range(RUSH_BAR_HEIGHT):
+            pulsate = (math.sin(phase + (y / RUSH_BAR_HEIGHT) * math.pi) + 1) / 2
+            pygame.draw.line(strip, (255, int(100 + pulsate * 155), int(100 + pulsate * 155)), (0, y), (RUSH_BAR_WIDTH, y))
+        frames.append(display_format(strip))
+    return frames
+
+def _build_shine():
+    shine = pygame.Surface((RUSH_BAR_WIDTH, SHINE_HEIGHT), pygame.SRCALPHA)
+    for y in range(SHINE_HEIGHT):
+        alpha = max(0, 150 - abs(y - SHINE_HEIGHT // 2) * 30)
+        pygame.draw.line(shine, (255, 255, 255, alpha), (0, y), (RUSH_BAR_WIDTH, y))
+    return display_format(shine)
+
+def prewarm_rush_bar():
+    """Build the gradient strips, phase frames and shine surface ahead of time."""
+    global _normal_strip, _rush_frames, _shine_surface
+    if _normal_strip is None:
+        _normal_strip = _build_normal_strip()
+        _rush_frames = _build_rush_frames()
+        _shine_surface = _build_shine()
+
 def draw_rush_bar(surface, rush_value, rush_active):
+    """Draw the meter and its labels; returns the rects drawn."""
+    prewarm_rush_bar()
     bar_rect = pygame.Rect(RUSH_BAR_X, RUSH_BAR_Y, RUSH_BAR_WIDTH, RUSH_BAR_HEIGHT)
     pygame.draw.rect(surface, (30, 30, 30), bar_rect, border_radius=10)
     pygame.draw.rect(surface, (80, 80, 80), bar_rect, width=3, border_radius=10)
 
-    fill_height = int((rush_value / RUSH_MAX) * RUSH_BAR_HEIGHT)
+    fill_height = max(0, min(int((rush_value / RUSH_MAX) * RUSH_BAR_HEIGHT), RUSH_BAR_HEIGHT))
     fill_rect = pygame.Rect(RUSH_BAR_X, RUSH_BAR_Y + RUSH_BAR_HEIGHT - fill_height, RUSH_BAR_WIDTH, fill_height)
 
-    fill_surface = pygame.Surface((RUSH_BAR_WIDTH, fill_height), pygame.SRCALPHA)
-    for y in range(fill_height):
+    if fill_height > 0:
         if rush_active:
-            pulsate = (math.sin((pygame.time.get_ticks() / 100) + (y / RUSH_BAR_HEIGHT) * math.pi) + 1) / 2
-            r, g, b = 255, int(100 + pulsate * 155), int(100 + pulsate * 155)
+            phase = (pygame.time.get_ticks() / 100) % (2 * math.pi)
+            strip = _rush_frames[int(phase / (2 * math.pi) * RUSH_PHASE_FRAMES) % RUSH_PHASE_FRAMES]
         else:
-            ratio = y / fill_height
-            r, g, b = 50, int(200 - 50 * ratio), int(255 - 100 * ratio)
-        pygame.draw.line(fill_surface, (r, g, b), (0, y), (RUSH_BAR_WIDTH, y))
-
-    surface.blit(fill_surface, (RUSH_BAR_X, RUSH_BAR_Y + RUSH_BAR_HEIGHT - fill_height))
+            strip = _normal_strip
+        surface.blit(strip, fill_rect.topleft, (0, 0, RUSH_BAR_WIDTH, fill_height))
     pygame.draw.rect(surface, (255, 255, 255, 50), fill_rect, width=2, border_radius=5)
 
     if rush_active and fill_height > 0:
         rush_shine(fill_height, surface)
 
     # Modern label with shadow
-    label_font = pygame.font.SysFont("Segoe UI", 24, bold=True)
-    label = label_font.render("RUSH", True, (255, 255, 255))
-    label_shadow = label_font.render("RUSH", True, (0, 0, 0))
-    label_rect = label.get_rect(center=(RUSH_BAR_X + RUSH_BAR_WIDTH // 2, RUSH_BAR_Y - 20))
-    surface.blit(label_shadow, label_rect.move(2, 2))
-    surface.blit(label, label_rect)
+    label_center = (RUSH_BAR_X + RUSH_BAR_WIDTH // 2, RUSH_BAR_Y - 20)
+    rects = [
+        bar_rect.inflate(0, SHINE_HEIGHT * 2),  # The shine can run past the top of a full bar
+        draw_text(surface, "RUSH", (0, 0, 0), size=24, bold=True, center=(label_center[0] + 2, label_center[1] + 2)),
+        draw_text(surface, "RUSH", (255, 255, 255), size=24, bold=True, center=label_center),
+    ]
 
     if rush_active:
-        rush_label = pygame.font.SysFont("Segoe UI", 28, bold=True).render("RUSH MODE!", True, (255, 50, 50))
-        rush_label_shadow = pygame.font.SysFont("Segoe UI", 28, bold=True).render("RUSH MODE!", True, (0, 0, 0))
-        rush_label_rect = rush_label.get_rect(center=(SCREEN_WIDTH // 2, 50))
-        surface.blit(rush_label_shadow, rush_label_rect.move(2, 2))
-        surface.blit(rush_label, rush_label_rect)
+        rush_label_center = (SCREEN_WIDTH // 2, 50)
+        rects.append(draw_text(surface, "RUSH MODE!", (0, 0, 0), size=28, bold=True, center=(rush_label_center[0] + 2, rush_label_center[1] + 2)))
+        rects.append(draw_text(surface, "RUSH MODE!", (255, 50, 50), size=28, bold=True, center=rush_label_center))
+    return rects
 
 def rush_shine(fill_height, surface):
-    shine_height = 10
-    shine_offset = (pygame.time.get_ticks() // 5) % (fill_height + shine_height) - shine_height
-    shine_rect = pygame.Rect(RUSH_BAR_X, RUSH_BAR_Y + RUSH_BAR_HEIGHT - fill_height + shine_offset, RUSH_BAR_WIDTH, shine_height)
-    shine_surface = pygame.Surface((RUSH_BAR_WIDTH, shine_height), pygame.SRCALPHA)
-    for y in range(shine_height):
-        alpha = max(0, 150 - abs(y - shine_height // 2) * 30)
-        pygame.draw.line(shine_surface, (255, 255, 255, alpha), (0, y), (RUSH_BAR_WIDTH, y))
-    surface.blit(shine_surface, shine_rect.topleft)
\ No newline at end of file
+    shine_offset = (pygame.time.get_ticks() // 5) % (fill_height + SHINE_HEIGHT) - SHINE_HEIGHT
+    surface.blit(_shine_surface, (RUSH_BAR_X, RUSH_BAR_Y + RUSH_BAR_HEIGHT - fill_height + shine_offset))
\ No newline at end of file
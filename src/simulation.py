@@ -0,0 +1,325 @@
+import argparse
+import math
+import random
+import time
+from collections import deque, namedtuple
+from note_logic import NoteLogic
+from note_field import NoteField
+from objects import ShortNote
+from config import (
+    NOTE_SPEED, SPAWN_INTERVAL, COMBO_FADE_TIME, HIT_WINDOW, PERFECT_THRESHOLD, GOOD_THRESHOLD,
+    HIT_WINDOW_MS, PERFECT_WINDOW_MS, GOOD_WINDOW_MS, NOTE_TIMING, SIM_STEP_MS, MAX_SIM_STEPS_PER_FRAME,
+    NUM_LANES, HIT_ZONE_X, RUSH_MAX, RUSH_GAIN_PER_HIT_NORMAL, RUSH_GAIN_PER_HIT_RUSH,
+    RUSH_DECAY_NORMAL, RUSH_DECAY_RUSH, RUSH_MULTIPLIER
+)
+
+def step_at(time, step_ms):
+    """Index of the first fixed step whose time is at or after `time` (steps count from 1)."""
+    step = max(math.ceil(time / step_ms), 1)
+    # Settle float rounding the same way step() compares step_index * step_ms
+    while step > 1 and (step - 1) * step_ms >= time:
+        step -= 1
+    while step * step_ms < time:
+        step += 1
+    return step
+
+# kind is one of "hit", "hold", "release", "complete" or "miss"; time is in song milliseconds
+Judgement = namedtuple("Judgement", "kind lane rating points time")
+
+class GameSimulation:
+    """Game rules without rendering: song time and lane input go in, state and judgements come out.
+
+    Nothing here touches the pygame display or clock, so sessions can be run
+    headlessly as fast as the CPU allows.
+
+    With note_timing="clock" notes are judged in milliseconds against their hit
+    timestamps and never moved by the simulation; the renderer places them with
+    note.sync(). With "frame" they are integrated every update and judged in pixels.
+
+    step() and advance() move time forward in fixed SIM_STEP_MS steps. Queued
+    input is applied right before the first step at or after its timestamp,
+    or the next step if the simulation is already past it, and is judged
+    against its own timestamp either way. The step is logged with the input,
+    so the same seed and input log always produce the same score.
+    """
+
+    def __init__(self, note_generator=None, note_timing=NOTE_TIMING, seed=None, step_ms=SIM_STEP_MS, input_delay=0):
+        self.seed = seed
+        self.step_ms = step_ms
+        # How late (ms) calibrated input can arrive; misses wait this long for it
+        self.input_delay = input_delay
+        self.clock_timing = note_timing == "clock"
+        if self.clock_timing:
+            self.windows = (HIT_WINDOW_MS, PERFECT_WINDOW_MS, GOOD_WINDOW_MS)
+        else:
+            self.windows = (HIT_WINDOW, PERFECT_THRESHOLD, GOOD_THRESHOLD)
+        self.note_field = NoteField(NUM_LANES)
+        self.note_generator = note_generator or NoteLogic({
+            'SPAWN_INTERVAL': SPAWN_INTERVAL,
+            'NUM_LANES': NUM_LANES,
+            'NOTE_SPEED': NOTE_SPEED
+        }, rng=random.Random(seed))
+        self.reset()
+
+    def reset(self):
+        self.time = 0
+        self.step_index = 0
+        self.pending_input = deque()  # (step, time_ms, lane, pressed) in step order
+        self.input_log = []  # (time_ms, lane, pressed, step) of every queued input, for replays
+        self.score = 0
+        self.combo = 0
+        self.last_combo_time = -COMBO_FADE_TIME
+        self.rush_meter = 0
+        self.in_rush_mode = False
+        self.note_field.clear()
+        self.events = []
+
+    def drain_events(self):
+        """Return and forget the judgements produced since the last call."""
+        events, self.events = self.events, []
+        return events
+
+    def song_over(self):
+        """True once a finite note source has run dry and every note has left the field."""
+        return self.note_generator.finished and len(self.note_field) == 0
+
+    def combo_visible(self):
+        return self.time - self.last_combo_time < COMBO_FADE_TIME
+
+    # --------------------------
+    # Scoring
+    # --------------------------
+
+    def _award(self, points):
+        """Apply the rush multiplier and meter gain to a judgement and add it to the score."""
+        if self.in_rush_mode:
+            points = int(points * RUSH_MULTIPLIER)
+            self.rush_meter = min(self.rush_meter + RUSH_GAIN_PER_HIT_RUSH, RUSH_MAX)
+        else:
+            self.rush_meter = min(self.rush_meter + RUSH_GAIN_PER_HIT_NORMAL, RUSH_MAX)
+            if self.rush_meter >= RUSH_MAX:
+                self.rush_meter = RUSH_MAX
+                self.in_rush_mode = True
+        self.score += points
+        return points
+
+    def _bump_combo(self, time):
+        self.combo += 1
+        self.last_combo_time = time
+
+    def _timing_error(self, note, time):
+        """Distance from the hit zone, in ms under clock timing and in pixels otherwise."""
+        if self.clock_timing:
+            return abs(time - note.hit_time)
+        return abs(note.pos.x - HIT_ZONE_X)
+
+    # --------------------------
+    # Input
+    # --------------------------
+
+    def press(self, lane, time=None):
+        """Judge a key press against the head of the lane queue."""
+        time = self.time if time is None else time
+        note_field = self.note_field
+        note = note_field.head(lane)
+        if note is None:
+            return None
+        hit_window, perfect_window, good_window = self.windows
+        error = self._timing_error(note, time)
+        if error >= hit_window:
+            return None
+        note_field.pop_head(lane)
+
+        if not isinstance(note, ShortNote):
+            note.held = True
+            note.start_hold_time = time
+            event = Judgement("hold", lane, "Hold!", 0, time)
+            self.events.append(event)
+            return event
+
+        if error <= perfect_window:
+            rating, grade_multiplier = "Perfect!", 1.5
+        elif error <= good_window:
+            rating, grade_multiplier = "Good!", 1.0
+        else:
+            rating, grade_multiplier = "OK", 0.5
+
+        note.hit = True
+        base_points = 100 + self.combo * 10
+        points = self._award(int(base_points * grade_multiplier))
+
+        # Handle chord logic for short notes
+        if note.chord_id is not None:
+            if note_field.chords.register_hit(note.chord_id):
+                for n in note_field.chords.release(note.chord_id):
+                    n.active = False
+                self._bump_combo(time)
+        else:
+            note.active = False
+            self._bump_combo(time)
+
+        event = Judgement("hit", lane, rating, points, time)
+        self.events.append(event)
+        return event
+
+    def release(self, lane, time=None):
+        """Score a held long note when its key is released."""
+        time = self.time if time is None else time
+        note = self.note_field.held_long(lane)
+        if note is None:
+            return None
+
+        elapsed = time - note.start_hold_time
+        max_duration = note.length / NOTE_SPEED * 1000  # Convert to ms
+        progress = min(elapsed / max_duration, 1.0)
+        points = self._award(int(200 * progress))  # 200 base points for long notes
+        if progress == 1.0:
+            rating = "Perfect!"
+        elif progress >= 0.8:
+            rating = "Good!"
+        else:
+            rating = "OK"
+        self._bump_combo(time)
+        note.held = False
+        note.active = False
+
+        event = Judgement("release", lane, rating, points, time)
+        self.events.append(event)
+        return event
+
+    def queue_input(self, lane, pressed, time, step=None):
+        """Queue a press or release to be judged at `time` and return the step that will apply it.
+
+        That is the fixed step that reaches `time`, or the next one for a time
+        the simulation has already stepped past (calibrated input, or a frame
+        behind an early step in advance()). Replays pass the logged step back in.
+        """
+        if step is None:
+            step = max(step_at(time, self.step_ms), self.step_index + 1)
+        self.pending_input.append((step, time, lane, pressed))
+        self.input_log.append((time, lane, pressed, step))
+        return step
+
+    # --------------------------
+    # Time Step
+    # --------------------------
+
+    def step(self):
+        """Apply due input and advance exactly one fixed step."""
+        self.step_index += 1
+        now = self.step_index * self.step_ms
+        pending = self.pending_input
+        while pending and pending[0][0] <= self.step_index:
+            _, input_time, lane, pressed = pending.popleft()
+            if pressed:
+                self.press(lane, input_time)
+            else:
+                self.release(lane, input_time)
+        self.update(now)
+
+    def advance(self, target_time, max_steps=MAX_SIM_STEPS_PER_FRAME):
+        """Run the fixed steps that fit before target_time; returns the interpolation factor.
+
+        The factor is how far target_time lies past the last step, in steps (0..1),
+        and is what the renderer uses to place things between steps. Input queued
+        up to target_time is judged in this call: if it falls after the last whole
+        step, one more step runs early and the factor goes negative (down to -1).
+        The steps themselves are the same either way, so results stay reproducible.
+        """
+        steps = 0
+        while (self.step_index + 1) * self.step_ms <= target_time and steps < max_steps:
+            self.step()
+            steps += 1
+        if self.pending_input and self.pending_input[0][1] <= target_time and steps < max_steps:
+            self.step()
+        return min(max((target_time - self.time) / self.step_ms, -1.0), 1.0)
+
+    def update(self, now):
+        """Advance the simulation to song time `now` (milliseconds)."""
+        dt = (now - self.time) / 1000  # dt in seconds
+        self.time = now
+        note_field = self.note_field
+
+        note_field.extend(self.note_generator.generate_notes(now, note_field))
+
+        # Rush mode decay logic
+        if self.in_rush_mode:
+            self.rush_meter -= RUSH_DECAY_RUSH * dt
+            if self.rush_meter <= 0:
+                self.rush_meter = 0
+                self.in_rush_mode = False
+        else:
+            self.rush_meter = max(self.rush_meter - RUSH_DECAY_NORMAL * dt, 0)
+
+        if self.clock_timing:
+            # Positions are derived from the song clock, so only lane heads need checking
+            note_field.cull_before(now)
+            expired = note_field.expire_before(now - HIT_WINDOW_MS - self.input_delay)
+        else:
+            # Update notes
+            note_field.cull(now)
+            for note in note_field:
+                note.update(dt)
+            expired = note_field.expire(HIT_ZONE_X - HIT_WINDOW - NOTE_SPEED * self.input_delay / 1000)
+
+        # Expire lane heads that scrolled past the hit window
+        for note in expired:
+            if isinstance(note, ShortNote):
+                if note.chord_id is not None:
+                    for n in note_field.chords.release(note.chord_id):
+                        n.active = False
+                self.combo = 0
+                self.events.append(Judgement("miss", note.lane, None, 0, now))
+
+        # Progress held long notes
+        for lane in range(NUM_LANES):
+            for note in note_field.long_notes_in(lane):
+                if self.clock_timing and now >= note.despawn_time:
+                    note.active = False
+                    continue
+                if note.held and not note.completed:
+                    elapsed = now - note.start_hold_time
+                    max_duration = note.length / NOTE_SPEED * 1000
+                    note.hold_progress = min(elapsed / max_duration, 1.0)
+                    if self.clock_timing:
+                        tail_passed = now - note.tail_time > HIT_WINDOW_MS + self.input_delay
+                    else:
+                        tail_passed = note.tail_x < HIT_ZONE_X - HIT_WINDOW - NOTE_SPEED * self.input_delay / 1000
+                    if tail_passed:
+                        # Automatically complete long note if tail passes hit zone
+                        note.completed = True
+                        note.active = False
+                        points = self._award(200)
+                        self._bump_combo(now)
+                        self.events.append(Judgement("complete", lane, "Perfect!", points, now))
+
+# --------------------------
+# Headless Sessions
+# --------------------------
+
+def run_session(duration_ms, inputs=(), seed=None, sim=None):
+    """Run one session headlessly; inputs are (time_ms, lane, pressed) tuples sorted by time."""
+    sim = sim or GameSimulation(seed=seed)
+    for input_time, lane, pressed in inputs:
+        sim.queue_input(lane, pressed, input_time)
+    while sim.time < duration_ms:
+        sim.step()
+        sim.events.clear()
+    return sim
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Jazz Hero sessions without a window.")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=60, help="session length in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first session; later ones count up")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for i in range(args.sessions):
+        run_session(args.duration * 1000, seed=args.seed + i)
+    elapsed = time.perf_counter() - start
+    print(f"{args.sessions} sessions of {args.duration:g}s in {elapsed:.2f}s "
+          f"({args.sessions / elapsed:.1f} sessions/s, {args.sessions * args.duration / elapsed:.0f}x real time)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import pygame
+
+class SongClock:
+    """Song position in milliseconds.
+
+    Runs off the pygame tick counter from the moment it is created; paused
+    time is never counted.
+    """
+
+    def __init__(self):
+        self.start_ticks = pygame.time.get_ticks()
+        self.paused_ticks = 0
+        self.paused_at = None
+        self.pause_started = None
+
+    def now(self):
+        if self.paused_at is not None:
+            return self.paused_at
+        return pygame.time.get_ticks() - self.start_ticks - self.paused_ticks
+
+    def pause(self):
+        if self.paused_at is None:
+            self.paused_at = self.now()
+            self.pause_started = pygame.time.get_ticks()
+
+    def resume(self):
+        if self.paused_at is not None:
+            self.paused_ticks += pygame.time.get_ticks() - self.pause_started
+            self.paused_at = None
+            self.pause_started = None
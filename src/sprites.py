@@ -0,0 +1,41 @@
+import pygame
+from utils import display_format
+from config import NOTE_RADIUS
+
+# --------------------------
+# Note Sprite Cache
+# --------------------------
+
+_note_sprites = {}
+
+def _render_note_sprite(color, radius):
+    """Render the glow and core of a note onto a single surface."""
+    glow_size = radius * 4
+    center = (glow_size // 2, glow_size // 2)
+    sprite = pygame.Surface((glow_size, glow_size), pygame.SRCALPHA)
+    sprite.fill((0, 0, 0, 0))
+    for i in range(10):
+        alpha = max(255 - i * 25, 0)
+        pygame.draw.circle(sprite, (*color, alpha), center, radius + i * radius * 3 // 20)
+    mask = pygame.Surface((glow_size, glow_size), pygame.SRCALPHA)
+    pygame.draw.circle(mask, (255, 255, 255), center, glow_size // 2)
+    sprite.blit(mask, (0, 0), None, pygame.BLEND_RGBA_MULT)
+    pygame.draw.circle(sprite, color, center, radius)
+    return display_format(sprite)
+
+def get_note_sprite(color, radius=NOTE_RADIUS):
+    """Return the cached glow sprite for a note color, rendering it on first use."""
+    key = (tuple(color), radius)
+    sprite = _note_sprites.get(key)
+    if sprite is None:
+        sprite = _note_sprites[key] = _render_note_sprite(color, radius)
+    return sprite
+
+def invalidate_note_sprites():
+    """Drop every cached note sprite, e.g. after changing lane_colors or NOTE_RADIUS."""
+    _note_sprites.clear()
+
+def prewarm_note_sprites(colors, radius=NOTE_RADIUS):
+    """Render the sprites for the given colors up front."""
+    for color in colors:
+        get_note_sprite(color, radius)
@@ -1,14 +1,6 @@
 import pygame
-from objects import Particle
-from config import UI
-
-# --------------------------
-# Particle Creation Utility
-# --------------------------
-
-def create_particles(position, color):
-    """Create a burst of particles at a given position."""
-    return [Particle(position, color) for _ in range(20)]
+from frame_pacing import FrameScheduler
+from config import UI, IDLE_FPS
 
 # --------------------------
 # UI Rendering Utilities
@@ -61,6 +53,20 @@ def draw_gradient_background(surface, top_color, bottom_color):
         rect = pygame.Rect(0, int(i * surface.get_height() / steps), surface.get_width(), int(surface.get_height() / steps))
         pygame.draw.rect(surface, blended_color, rect)
 
+# --------------------------
+# Surface Utilities
+# --------------------------
+
+def display_format(surface, alpha=True):
+    """Convert a surface to the display's pixel format so it blits fast.
+
+    Headless tools build surfaces before any display mode is set; with no
+    format to convert to, the surface is returned unchanged.
+    """
+    if pygame.display.get_surface() is None:
+        return surface
+    return surface.convert_alpha() if alpha else surface.convert()
+
 # --------------------------
 # Game Flow Utilities
 # --------------------------
@@ -68,9 +74,10 @@ def draw_gradient_background(surface, top_color, bottom_color):
 def countdown_timer(screen, background_color, font_color=(255, 255, 255), go_color=(0, 255, 0)):
     """Display a 3-second countdown with GO! animation."""
     countdown_seconds = 3
-    clock = pygame.time.Clock()
+    scheduler = FrameScheduler(IDLE_FPS)
     start_ticks = pygame.time.get_ticks()
     font_large = pygame.font.SysFont("Segoe UI", 150, bold=True)
+    shown = None
     
     while True:
         elapsed = (pygame.time.get_ticks() - start_ticks) / 1000
@@ -83,14 +90,16 @@ def countdown_timer(screen, background_color, font_color=(255, 255, 255), go_col
                 pygame.quit()
                 return
 
-        # Render countdown numbers
+        # Render countdown numbers, only when the number changes
         countdown_value = countdown_seconds - int(elapsed)
-        screen.fill(background_color)
-        countdown_text = font_large.render(str(countdown_value), True, font_color)
-        text_rect = countdown_text.get_rect(center=(screen.get_width()//2, screen.get_height()//2))
-        screen.blit(countdown_text, text_rect)
-        pygame.display.flip()
-        clock.tick(60)
+        if countdown_value != shown:
+            shown = countdown_value
+            screen.fill(background_color)
+            countdown_text = font_large.render(str(countdown_value), True, font_color)
+            text_rect = countdown_text.get_rect(center=(screen.get_width()//2, screen.get_height()//2))
+            screen.blit(countdown_text, text_rect)
+            pygame.display.flip()
+        scheduler.tick()
 
     # Show GO! message
     screen.fill(background_color)
@@ -0,0 +1,112 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from replay import Replay, simulate_replay
+
+# --------------------------
+# Bulk Replay Verification
+# --------------------------
+#
+# Replays are re-scored by GameSimulation, which applies the same rules as a
+# live game (grade multipliers, combo bonus, rush meter and RUSH_MULTIPLIER).
+# Paths are split into shards and each worker loads, simulates and drops one
+# replay at a time, so worker memory does not grow with the batch. Only a few
+# shards per worker are in flight at once, which bounds the parent too.
+
+DEFAULT_SHARD_SIZE = 64
+SHARDS_IN_FLIGHT_PER_WORKER = 2
+LIVE_CHECK_OFFSETS = (0, 35, 60, -40, 150)  # Input offsets in ms cycled through by --record-live
+
+def verify_shard(paths):
+    """Re-score a shard of replays; returns (path, claimed, simulated, played_ms, error) per replay."""
+    results = []
+    for path in paths:
+        try:
+            replay = Replay.load(path)
+            sim = simulate_replay(replay)
+            results.append((path, replay.score, sim.score, replay.steps * replay.step_ms, None))
+        except Exception as exc:  # A broken replay must not take the shard down with it
+            results.append((path, None, None, 0, f"{type(exc).__name__}: {exc}"))
+    return results
+
+def record_live_replays(directory, sessions, duration_ms=60000, seed=0):
+    """Save replays of live-style autoplay sessions, cycling through LIVE_CHECK_OFFSETS.
+
+    Their input is read late and queued behind early steps the way keyboard
+    input is, so verifying them checks that replays reproduce such input.
+    """
+    from autoplay import AutoPlayer, live_session  # Pulls in pygame for the effects
+    os.makedirs(directory, exist_ok=True)
+    for i in range(sessions):
+        offset = LIVE_CHECK_OFFSETS[i % len(LIVE_CHECK_OFFSETS)]
+        sim = live_session(AutoPlayer("gaussian", seed=seed + i), duration_ms, offset, seed + i)
+        Replay.from_simulation(sim).save(os.path.join(directory, f"live-{seed + i}-{offset:+d}ms.jhr"))
+
+def find_replays(paths):
+    """Expand directories to the replays inside them."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found.extend(sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith(".jhr")))
+        else:
+            found.append(path)
+    return found
+
+def shard(paths, size):
+    for i in range(0, len(paths), size):
+        yield paths[i:i + size]
+
+def verify_replays(paths, workers=None, shard_size=DEFAULT_SHARD_SIZE):
+    """Yield verify_shard results as shards finish, keeping every worker busy."""
+    workers = workers or os.cpu_count() or 1
+    shards = shard(paths, shard_size)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for _ in range(workers * SHARDS_IN_FLIGHT_PER_WORKER):
+            paths = next(shards, None)
+            if paths is None:
+                break
+            pending.add(pool.submit(verify_shard, paths))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                paths = next(shards, None)
+                if paths is not None:
+                    pending.add(pool.submit(verify_shard, paths))
+                yield from future.result()
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score Jazz Hero replays in parallel and report mismatches.")
+    parser.add_argument("replays", nargs="+", help="replay files or directories of replays")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="replays per work unit")
+    parser.add_argument("--record-live", type=int, metavar="SESSIONS",
+                        help="first save this many live-style autoplay replays into the first directory given")
+    args = parser.parse_args()
+
+    if args.record_live:
+        record_live_replays(args.replays[0], args.record_live)
+
+    paths = find_replays(args.replays)
+    checked = mismatches = errors = 0
+    played_ms = 0
+    start = time.perf_counter()
+    for path, claimed, simulated, played, error in verify_replays(paths, args.workers, args.shard_size):
+        checked += 1
+        played_ms += played
+        if error is not None:
+            errors += 1
+            print(f"{path}: ERROR {error}")
+        elif claimed != simulated:
+            mismatches += 1
+            print(f"{path}: MISMATCH claimed {claimed}, simulated {simulated}")
+    elapsed = max(time.perf_counter() - start, 1e-9)
+
+    print(f"{checked} replays, {mismatches} mismatches, {errors} errors in {elapsed:.2f}s "
+          f"({checked / elapsed:.1f} replays/s, {played_ms / 1000 / elapsed:.0f}x real time)")
+    sys.exit(1 if mismatches or errors else 0)
+
+if __name__ == "__main__":
+    main()